@@ -1,11 +1,12 @@
-from flask import Flask, jsonify
+from flask import Flask
 from flask_cors import CORS
 from flask_pymongo import PyMongo
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from pymongo import MongoClient
 import os
-from app.utils.json_encoder import MongoJSONEncoder
+from app.utils.json_encoder import MongoJSONEncoder, jsonify
+from app.utils.compression import compress_response
 from app.config import config
 
 # Initialize extensions
@@ -87,6 +88,9 @@ def create_app(config_name='default'):
     app.register_blueprint(settings_bp)
     app.register_blueprint(notifications_bp)
     
+    # Compress large responses for clients that accept it
+    app.after_request(compress_response)
+    
     @app.errorhandler(500)
     def handle_500(error):
         return jsonify({'error': 'Internal Server Error', 'message': str(error)}), 500
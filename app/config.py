@@ -14,7 +14,37 @@ class Config:
     
     # Repository settings
     REPO_DIR = os.path.join(os.getcwd(), 'repos')
-    
+
+    # Analysis cache settings (defaults to a directory inside REPO_STORAGE_DIR)
+    ANALYSIS_CACHE_DIR = os.environ.get('ANALYSIS_CACHE_DIR', None)
+    ANALYSIS_CACHE_MAX_MB = int(os.environ.get('ANALYSIS_CACHE_MAX_MB', '512'))
+
+    # Parallel analysis settings (1 worker analyzes files serially)
+    ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', '1'))
+    ANALYSIS_PARALLEL_MIN_FILES = int(os.environ.get('ANALYSIS_PARALLEL_MIN_FILES', '200'))
+    ANALYSIS_CHUNK_SIZE = int(os.environ.get('ANALYSIS_CHUNK_SIZE', '64'))
+
+    # Comma-separated directory names the analyzer skips (unset uses the built-in deny-list)
+    ANALYSIS_IGNORE_DIRS = os.environ.get('ANALYSIS_IGNORE_DIRS', None)
+
+    # Source files larger than this are listed but not parsed
+    ANALYSIS_MAX_FILE_BYTES = int(os.environ.get('ANALYSIS_MAX_FILE_BYTES', str(1024 * 1024)))
+
+    # CPU seconds one file's extraction may take before it is abandoned and marked truncated (0 disables)
+    ANALYSIS_FILE_BUDGET_SECONDS = float(os.environ.get('ANALYSIS_FILE_BUDGET_SECONDS', '5'))
+
+    # Analysis jobs without progress for this long are treated as dead and can be restarted
+    ANALYSIS_JOB_STALE_SECONDS = int(os.environ.get('ANALYSIS_JOB_STALE_SECONDS', '900'))
+
+    # Directory slices up to this many levels deep are analyzed in the request while the full analysis job runs
+    ANALYSIS_MAX_INLINE_DEPTH = int(os.environ.get('ANALYSIS_MAX_INLINE_DEPTH', '2'))
+
+    # JSON serializer: 'auto' uses orjson when it is installed, 'stdlib' always uses the json module
+    JSON_SERIALIZER = os.environ.get('JSON_SERIALIZER', 'auto')
+
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+
     # Rate limiting
     RATELIMIT_DEFAULT = "200 per day"
     RATELIMIT_STRATEGY = 'fixed-window'
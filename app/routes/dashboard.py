@@ -1,5 +1,6 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint
 from app import mongo, limiter
+from app.utils.json_encoder import jsonify
 from datetime import datetime, timedelta
 import random
 
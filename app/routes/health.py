@@ -1,4 +1,5 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
+from app.utils.json_encoder import jsonify
 
 health_bp = Blueprint('health', __name__, url_prefix='/api/health')
 root_bp = Blueprint('root', __name__)
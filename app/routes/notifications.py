@@ -1,5 +1,6 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 from app.services.notification_service import NotificationService, add_sample_notifications
+from app.utils.json_encoder import jsonify
 from app import limiter
 
 notifications_bp = Blueprint('notifications', __name__, url_prefix='/api/notifications')
@@ -1,6 +1,13 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, request, stream_with_context
 from app.services.repository_service import RepositoryService
-from app.services.enhanced_repository_service import EnhancedRepositoryService
+from app.services.enhanced_repository_service import EnhancedRepositoryService, analysis_version
+from app.services.analysis_cache_service import AnalysisCacheService
+from app.services.analysis_job_service import AnalysisJobService, JOB_FAILED
+from app.utils.columnar_tree import to_columnar
+from app.utils.compression import negotiate_encoding
+from app.utils.etag import make_etag, matching_etag, not_modified
+from app.utils.json_encoder import dumps, jsonify
+from app.utils.repo_walker import normalize_subdirectory
 from app import limiter
 
 repo_bp = Blueprint('repositories', __name__, url_prefix='')
@@ -57,7 +64,15 @@ def get_repository(repo_id):
     if not repository:
         return jsonify({'error': 'Repository not found'}), 404
     
-    return jsonify(repository), 200
+    # Skip sending the document when the client's copy is current
+    etag = RepositoryService.get_etag(repository)
+    matched = matching_etag(etag)
+    if matched:
+        return not_modified(matched)
+    
+    response = jsonify(repository)
+    response.set_etag(etag)
+    return response, 200
 
 @repo_bp.route('/api/repositories/<repo_id>', methods=['DELETE'])
 @limiter.limit("20/minute")
@@ -85,22 +100,126 @@ def analyze_repository(repo_id):
         # Log the request
         print(f"Analyzing repository with ID: {repo_id}")
         
-        # Get the analysis using the enhanced service
-        analysis = EnhancedRepositoryService.analyze_repository_code(repo_id)
+        # Optionally only analyze one directory, a limited number of levels deep
+        path = request.args.get('path')
+        depth = request.args.get('depth', type=int)
+        if depth is not None and depth < 1:
+            return jsonify({'error': 'depth must be a positive integer'}), 400
+        
+        # Stream one node per line instead of building the whole tree
+        response_format = request.args.get('format')
+        if response_format == 'ndjson':
+            nodes, job, error = AnalysisJobService.request_stream(repo_id, path, depth)
+            if error:
+                print(f"Error analyzing repository {repo_id}: {error}")
+                return jsonify({'error': error}), 404
+            if job:
+                if job['status'] == JOB_FAILED:
+                    return jsonify({'error': f"Analysis failed: {job['error']}", 'job': job}), 500
+                return jsonify(job), 202, {'Location': job['status_url']}
+            
+            lines = (dumps(node) + b'\n' for node in nodes)
+            return Response(stream_with_context(lines), mimetype='application/x-ndjson'), 200
+        
+        # Send the tree as parallel arrays instead of nested objects
+        columnar = response_format == 'columnar'
+        
+        # '/' without a depth is the whole repository
+        subtree = depth is not None or normalize_subdirectory(path) != '.'
+        
+        etag = None
+        if not subtree:
+            repo_path, error = EnhancedRepositoryService._get_repository_path(repo_id)
+            if error:
+                print(f"Error analyzing repository {repo_id}: {error}")
+                return jsonify({'error': error}), 404
+            
+            # The analysis of a commit by one analyzer version never changes, so it can be revalidated without reading it
+            commit_sha = RepositoryService.get_head_commit(repo_path)
+            etag = make_etag(repo_id, commit_sha, analysis_version(), 'columnar' if columnar else 'tree') if commit_sha else None
+            if etag:
+                matched = matching_etag(etag)
+                if matched:
+                    return not_modified(matched)
+            
+            # Serve the cached analysis precompressed when the client accepts it
+            encoding = negotiate_encoding(request.accept_encodings)
+            if encoding and commit_sha:
+                payload = AnalysisCacheService.get_payload(repo_id, commit_sha, analysis_version(), encoding, columnar)
+                if payload is not None:
+                    response = Response(payload, mimetype='application/json', headers={
+                        'Content-Encoding': encoding,
+                        'Vary': 'Accept-Encoding'
+                    })
+                    response.set_etag(f"{etag}-{encoding}")
+                    return response, 200
+        
+        # Serve the cached analysis, or hand out the job producing it
+        analysis, job, error = AnalysisJobService.request_analysis(repo_id, path, depth)
         
         # Check for errors
-        if 'error' in analysis:
-            print(f"Error analyzing repository {repo_id}: {analysis['error']}")
-            return jsonify({'error': analysis['error']}), 404
+        if error:
+            print(f"Error analyzing repository {repo_id}: {error}")
+            return jsonify({'error': error}), 404
+        
+        if job:
+            if job['status'] == JOB_FAILED:
+                return jsonify({'error': f"Analysis failed: {job['error']}", 'job': job}), 500
+            return jsonify(job), 202, {'Location': job['status_url']}
         
         # Log success
         print(f"Successfully analyzed repository {repo_id}")
         
-        return jsonify(analysis), 200
+        if columnar:
+            analysis = to_columnar(analysis)
+        response = jsonify(analysis)
+        if etag:
+            response.set_etag(etag)
+        return response, 200
     except Exception as e:
         print(f"Exception analyzing repository {repo_id}: {str(e)}")
         return jsonify({'error': f'Failed to analyze repository: {str(e)}'}), 500
 
+@repo_bp.route('/api/repositories/<repo_id>/analysis', methods=['POST'])
+@limiter.limit("10/minute")
+def start_repository_analysis(repo_id):
+    """Start a background analysis of a repository."""
+    if not repo_id or repo_id == 'null' or repo_id == 'undefined' or repo_id == 'None':
+        return jsonify({'error': f'Invalid repository ID: {repo_id}'}), 400
+    
+    try:
+        job, error = AnalysisJobService.start_job(repo_id)
+        if error:
+            return jsonify({'error': error}), 404
+        
+        return jsonify(job), 202, {'Location': job['status_url']}
+    except Exception as e:
+        print(f"Exception starting analysis of repository {repo_id}: {str(e)}")
+        return jsonify({'error': f'Failed to start analysis: {str(e)}'}), 500
+
+@repo_bp.route('/api/repositories/<repo_id>/analysis/<job_id>', methods=['GET'])
+@limiter.limit("120/minute")
+def get_analysis_job(repo_id, job_id):
+    """Get the status of an analysis job."""
+    job = AnalysisJobService.get_job(repo_id, job_id)
+    
+    if not job:
+        return jsonify({'error': 'Analysis job not found'}), 404
+    
+    return jsonify(job), 200
+
+@repo_bp.route('/api/repositories/analysis/budget', methods=['GET'])
+@limiter.limit("30/minute")
+def get_analysis_budget_stats():
+    """Get parse budget hits across analysis jobs, to find pathological repositories."""
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    stats = AnalysisJobService.get_budget_stats(limit)
+    
+    if 'error' in stats:
+        return jsonify(stats), 500
+    
+    return jsonify(stats), 200
+
 @repo_bp.route('/api/repositories/languages', methods=['GET'])
 @limiter.limit("50/minute")
 def get_languages():
@@ -1,5 +1,6 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 from ..services.repository_service import RepositoryService
+from ..utils.json_encoder import jsonify
 from .. import limiter
 
 repo_bp = Blueprint('repository', __name__, url_prefix='/api/repositories')
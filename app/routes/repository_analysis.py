@@ -1,5 +1,13 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 from app.services.repository_service import RepositoryService
+from app.services.analysis_job_service import AnalysisJobService, JOB_FAILED
+from app.services.dependency_graph_service import DependencyGraphService
+from app.services.path_index_service import PathIndexService
+from app.utils.columnar_tree import to_columnar
+from app.utils.etag import matching_etag, not_modified
+from app.utils.json_encoder import jsonify
+from app.utils.path_filter import PathFilter
+from app.utils.repo_walker import is_walkable_directory, normalize_subdirectory
 from app import limiter
 import os
 
@@ -21,18 +29,60 @@ def get_repository_structure(repo_id):
     if not repo_path or not os.path.exists(repo_path):
         return jsonify({'error': 'Repository directory not found'}), 404
     
+    # Optionally only walk one directory, a limited number of levels deep
+    depth = request.args.get('depth', type=int)
+    if depth is not None and depth < 1:
+        return jsonify({'error': 'depth must be a positive integer'}), 400
+    
+    start = normalize_subdirectory(request.args.get('path'))
+    if not is_walkable_directory(repo_path, start, path_filter=PathFilter.for_repository(repo_path)):
+        return jsonify({'error': 'Directory not found'}), 404
+    
     # Build file tree
     file_tree = {
-        'name': os.path.basename(repo_path),
-        'path': '',
+        'name': os.path.basename(repo_path) if start == '.' else start.rsplit('/', 1)[-1],
+        'path': '' if start == '.' else '/' + start,
         'type': 'directory',
         'children': []
     }
     
-    RepositoryService._build_file_tree(repo_path, file_tree['children'], '')
+    RepositoryService._build_file_tree(repo_path, file_tree['children'], start, depth)
+    
+    # Send the tree as parallel arrays instead of nested objects
+    if request.args.get('format') == 'columnar':
+        return jsonify({'structure': to_columnar(file_tree)}), 200
     
     return jsonify({'structure': file_tree}), 200
 
+@repo_analysis_bp.route('/<repo_id>/structure/children', methods=['GET'])
+@limiter.limit("120/minute")
+def get_structure_children(repo_id):
+    """Get one page of the immediate children of a directory, for lazy tree expansion."""
+    if not repo_id or repo_id == 'null' or repo_id == 'undefined' or repo_id == 'None':
+        return jsonify({'error': f'Invalid repository ID: {repo_id}'}), 400
+        
+    repository = RepositoryService.get_repository(repo_id)
+    if not repository:
+        return jsonify({'error': 'Repository not found'}), 404
+    
+    # Get repository path
+    repo_path = repository.get('repo_path')
+    if not repo_path or not os.path.exists(repo_path):
+        return jsonify({'error': 'Repository directory not found'}), 404
+    
+    # Get query parameters
+    path = request.args.get('path', '/')
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)  # Cap at 1000
+    cursor = request.args.get('cursor')
+    
+    page, error = PathIndexService.get_children(repo_id, repo_path, path, limit, cursor)
+    if error == 'Invalid cursor':
+        return jsonify({'error': error}), 400
+    if error:
+        return jsonify({'error': error}), 404
+    
+    return jsonify(page), 200
+
 @repo_analysis_bp.route('/<repo_id>/dependencies', methods=['GET'])
 @limiter.limit("30/minute")
 def get_repository_dependencies(repo_id):
@@ -40,15 +90,17 @@ def get_repository_dependencies(repo_id):
     if not repo_id or repo_id == 'null' or repo_id == 'undefined' or repo_id == 'None':
         return jsonify({'error': f'Invalid repository ID: {repo_id}'}), 400
         
-    # Get repository analysis which includes dependencies
-    analysis = RepositoryService.analyze_repository_code(repo_id)
-    if 'error' in analysis:
-        return jsonify({'error': analysis['error']}), 404
-    
-    # Extract dependencies from the analysis
-    dependencies = []
-    if 'graph' in analysis and 'edges' in analysis['graph']:
-        dependencies = analysis['graph']['edges']
+    # Get the dependency graph stored with the repository analysis, or the job producing it
+    graph, job, error = AnalysisJobService.request_graph(repo_id)
+    if error:
+        return jsonify({'error': error}), 404
+    if job:
+        if job['status'] == JOB_FAILED:
+            return jsonify({'error': f"Analysis failed: {job['error']}", 'job': job}), 500
+        return jsonify(job), 202, {'Location': job['status_url']}
+    
+    # Optionally only list the edges leaving one file and its functions
+    dependencies = DependencyGraphService.get_edges(graph, request.args.get('file'))
     
     return jsonify({'dependencies': dependencies}), 200
 
@@ -59,19 +111,17 @@ def get_repository_functions(repo_id):
     if not repo_id or repo_id == 'null' or repo_id == 'undefined' or repo_id == 'None':
         return jsonify({'error': f'Invalid repository ID: {repo_id}'}), 400
         
-    # Get repository analysis
-    analysis = RepositoryService.analyze_repository_code(repo_id)
-    if 'error' in analysis:
-        return jsonify({'error': analysis['error']}), 404
-    
-    # Extract functions from the analysis
-    functions = []
-    if 'graph' in analysis and 'nodes' in analysis['graph']:
-        # Filter nodes to only include functions and methods
-        functions = [
-            node for node in analysis['graph']['nodes'] 
-            if node.get('type') in ['function', 'method']
-        ]
+    # Get the dependency graph stored with the repository analysis, or the job producing it
+    graph, job, error = AnalysisJobService.request_graph(repo_id)
+    if error:
+        return jsonify({'error': error}), 404
+    if job:
+        if job['status'] == JOB_FAILED:
+            return jsonify({'error': f"Analysis failed: {job['error']}", 'job': job}), 500
+        return jsonify(job), 202, {'Location': job['status_url']}
+    
+    # Function and method nodes of the graph
+    functions = DependencyGraphService.get_functions(graph)
     
     # Apply optional filters
     file_filter = request.args.get('file')
@@ -96,16 +146,24 @@ def get_repository_languages(repo_id):
     if not repository:
         return jsonify({'error': 'Repository not found'}), 404
     
+    # Skip sending the statistics when the client's copy is current
+    etag = RepositoryService.get_etag(repository)
+    matched = matching_etag(etag)
+    if matched:
+        return not_modified(matched)
+    
     # Get languages from repository
     languages = repository.get('languages', {})
     
     # Calculate total bytes
     total_bytes = repository.get('total_size', 0)
     
-    return jsonify({
+    response = jsonify({
         'languages': languages,
         'total_bytes': total_bytes
-    }), 200
+    })
+    response.set_etag(etag)
+    return response, 200
 
 @repo_analysis_bp.route('/<repo_id>/files', methods=['GET'])
 @limiter.limit("50/minute")
@@ -1,5 +1,6 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 from app.services.repository_service import RepositoryService
+from app.utils.json_encoder import jsonify
 from app import limiter
 from datetime import datetime, timedelta
 import random
@@ -1,4 +1,5 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
+from app.utils.json_encoder import jsonify
 from app import limiter, mongo
 from bson import ObjectId
 import re
@@ -1,5 +1,6 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 from app.services.settings_service import SettingsService
+from app.utils.json_encoder import jsonify
 from app import limiter
 
 settings_bp = Blueprint('settings', __name__, url_prefix='/api/settings')
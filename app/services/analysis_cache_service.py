@@ -0,0 +1,233 @@
+import os
+import json
+import shutil
+import tempfile
+from typing import Dict, Optional
+
+from app.utils.columnar_tree import to_columnar
+from app.utils.compression import ENCODING_EXTENSIONS, compress, min_compress_bytes
+from app.utils.config_utils import get_config
+from app.utils.json_encoder import dumps, response_body
+
+
+class AnalysisCacheService:
+    """
+    Durable cache for analysis results.
+
+    Entries live under ``ANALYSIS_CACHE_DIR`` (by default a directory inside
+    ``REPO_STORAGE_DIR``), one file per repository, commit and analyzer version,
+    with compressed response bodies of the analysis stored next to it.
+    The file mtime doubles as the last-access time so the cache can be trimmed
+    in least-recently-used order once it grows past ``ANALYSIS_CACHE_MAX_MB``.
+    """
+
+    @staticmethod
+    def get_cache_dir() -> str:
+        """Get the directory holding cached analysis results, creating it if needed."""
+        cache_dir = get_config('ANALYSIS_CACHE_DIR')
+        if not cache_dir:
+            storage_dir = get_config('REPO_STORAGE_DIR') or os.path.join(tempfile.gettempdir(), 'repos')
+            cache_dir = os.path.join(storage_dir, '.analysis_cache')
+        os.makedirs(cache_dir, exist_ok=True)
+        return cache_dir
+
+    @staticmethod
+    def _entry_path(repo_id: str, commit_sha: str, version: str) -> str:
+        """Get the file path of a cache entry."""
+        repo_dir = os.path.join(AnalysisCacheService.get_cache_dir(), repo_id)
+        return os.path.join(repo_dir, f"{commit_sha}-v{version}.json")
+
+    @staticmethod
+    def _read_entry(entry_path: str) -> Optional[Dict]:
+        """Read a cache file and mark it as recently used."""
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            os.utime(entry_path, None)
+            return data
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading analysis cache entry {entry_path}: {e}")
+            return None
+
+    @staticmethod
+    def _write_entry(entry_path: str, data: Dict) -> bool:
+        """Atomically write a cache file. Returns True on success."""
+        return AnalysisCacheService._write_bytes(entry_path, dumps(data))
+
+    @staticmethod
+    def _write_bytes(entry_path: str, data: bytes) -> bool:
+        """Atomically write a cache file holding raw bytes. Returns True on success."""
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            # Write to a temporary file first so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, entry_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            return True
+        except Exception as e:
+            print(f"Error writing analysis cache entry {entry_path}: {e}")
+            return False
+
+    @staticmethod
+    def get(repo_id: str, commit_sha: str, version: str) -> Optional[Dict]:
+        """
+        Look up a cached analysis.
+
+        Args:
+            repo_id: ID of the repository
+            commit_sha: HEAD commit the analysis was computed for
+            version: Analyzer version that produced the analysis
+
+        Returns:
+            The cached analysis, or None on a cache miss
+        """
+        entry_path = AnalysisCacheService._entry_path(repo_id, commit_sha, version)
+        return AnalysisCacheService._read_entry(entry_path)
+
+    @staticmethod
+    def put(repo_id: str, commit_sha: str, version: str, analysis: Dict) -> None:
+        """
+        Store an analysis result and trim the cache back under its size limit.
+
+        Args:
+            repo_id: ID of the repository
+            commit_sha: HEAD commit the analysis was computed for
+            version: Analyzer version that produced the analysis
+            analysis: The analysis result to store
+        """
+        entry_path = AnalysisCacheService._entry_path(repo_id, commit_sha, version)
+        if not AnalysisCacheService._write_entry(entry_path, analysis):
+            return
+
+        max_mb = get_config('ANALYSIS_CACHE_MAX_MB', 512)
+        AnalysisCacheService.evict(int(max_mb) * 1024 * 1024)
+
+    @staticmethod
+    def get_payload(repo_id: str, commit_sha: str, version: str, encoding: str, columnar: bool = False) -> Optional[bytes]:
+        """
+        Get a cached analysis as a compressed JSON response body.
+
+        The body is compressed on the first request for an encoding and stored
+        next to the analysis, so later requests serve the stored bytes without
+        serializing or compressing again.
+
+        Args:
+            repo_id: ID of the repository
+            commit_sha: HEAD commit the analysis was computed for
+            version: Analyzer version that produced the analysis
+            encoding: One of the compression ENCODINGS
+            columnar: Whether to encode the analysis in the columnar format
+
+        Returns:
+            The compressed body, or None on a cache miss or if the body is
+            smaller than COMPRESSION_MIN_BYTES and should go out uncompressed
+        """
+        variant = '-columnar' if columnar else ''
+        payload_path = os.path.join(
+            AnalysisCacheService.get_cache_dir(), repo_id,
+            f"{commit_sha}-v{version}{variant}.json.{ENCODING_EXTENSIONS[encoding]}"
+        )
+        try:
+            with open(payload_path, 'rb') as f:
+                payload = f.read()
+            os.utime(payload_path, None)
+            return payload
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error reading analysis cache entry {payload_path}: {e}")
+            return None
+
+        analysis = AnalysisCacheService.get(repo_id, commit_sha, version)
+        if analysis is None:
+            return None
+        # Same bytes as the uncompressed response, so both representations agree
+        body = response_body(to_columnar(analysis) if columnar else analysis)
+        if len(body) < min_compress_bytes():
+            return None
+
+        payload = compress(body, encoding)
+        AnalysisCacheService._write_bytes(payload_path, payload)
+        return payload
+
+    @staticmethod
+    def get_graph(repo_id: str, commit_sha: str, version: str) -> Optional[Dict]:
+        """Look up the cached dependency graph of an analysis, or None on a cache miss."""
+        graph_path = os.path.join(AnalysisCacheService.get_cache_dir(), repo_id, f"{commit_sha}-v{version}-graph.json")
+        return AnalysisCacheService._read_entry(graph_path)
+
+    @staticmethod
+    def put_graph(repo_id: str, commit_sha: str, version: str, graph: Dict) -> None:
+        """Store the dependency graph of an analysis next to the analysis itself."""
+        graph_path = os.path.join(AnalysisCacheService.get_cache_dir(), repo_id, f"{commit_sha}-v{version}-graph.json")
+        AnalysisCacheService._write_entry(graph_path, graph)
+
+    @staticmethod
+    def get_manifest(repo_id: str, version: str) -> Optional[Dict]:
+        """
+        Get the per-file manifest of the last analysis of a repository.
+
+        The manifest maps file paths to their size, mtime, content hash and
+        extraction result, and is used to re-parse only changed files.
+        """
+        manifest_path = os.path.join(AnalysisCacheService.get_cache_dir(), repo_id, f"manifest-v{version}.json")
+        return AnalysisCacheService._read_entry(manifest_path)
+
+    @staticmethod
+    def put_manifest(repo_id: str, version: str, manifest: Dict) -> None:
+        """Store the per-file manifest of the latest analysis of a repository."""
+        manifest_path = os.path.join(AnalysisCacheService.get_cache_dir(), repo_id, f"manifest-v{version}.json")
+        AnalysisCacheService._write_entry(manifest_path, manifest)
+
+    @staticmethod
+    def invalidate(repo_id: str) -> None:
+        """Remove all cached analyses of a repository."""
+        repo_dir = os.path.join(AnalysisCacheService.get_cache_dir(), repo_id)
+        shutil.rmtree(repo_dir, ignore_errors=True)
+
+    @staticmethod
+    def evict(max_bytes: int) -> int:
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = []
+        total_size = 0
+        cache_dir = AnalysisCacheService.get_cache_dir()
+
+        for root, _, files in os.walk(cache_dir):
+            for file_name in files:
+                # Leave files that are still being written alone
+                if file_name.endswith('.tmp'):
+                    continue
+                entry_path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(entry_path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry_path))
+                total_size += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_size <= max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+                total_size -= size
+                removed += 1
+            except OSError as e:
+                print(f"Error evicting analysis cache entry {entry_path}: {e}")
+
+        return removed
@@ -0,0 +1,351 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional, Tuple
+
+from bson import ObjectId
+from flask import current_app
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.services.analysis_cache_service import AnalysisCacheService
+from app.services.dependency_graph_service import DependencyGraphService
+from app.services.enhanced_repository_service import EnhancedRepositoryService, analysis_version
+from app.services.repository_service import RepositoryService, get_mongo
+from app.utils.config_utils import get_config
+
+# Job states; queued and running jobs are in flight ('active')
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+# Minimum seconds between two progress writes of a running job
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+# Paths of truncated files kept on a job document
+MAX_TRUNCATED_PATHS = 100
+
+# Set once the collection indexes have been created by this process
+_indexes_created = False
+
+
+class AnalysisJobService:
+    """Runs repository analyses in background threads, tracked in the analysis_jobs collection."""
+
+    @staticmethod
+    def _ensure_indexes():
+        """Create the collection indexes the jobs rely on, once per process."""
+        global _indexes_created
+        if _indexes_created:
+            return
+        get_mongo().db.analysis_jobs.create_index(
+            [('repo_id', ASCENDING), ('commit_sha', ASCENDING)],
+            unique=True,
+            partialFilterExpression={'active': True}
+        )
+        _indexes_created = True
+
+    @staticmethod
+    def request_analysis(repo_id: str, path: Optional[str] = None, depth: Optional[int] = None) -> Tuple[Optional[Dict], Optional[Dict], Optional[str]]:
+        """
+        Get the analysis of a repository, or of one of its directories, or the job that is producing it.
+
+        Cached analyses are returned (or sliced to the requested directory and
+        depth) directly and a job is started on a cache miss. While that job
+        runs, slices at most ANALYSIS_MAX_INLINE_DEPTH levels deep are analyzed
+        in the request. Repositories without a commit SHA cannot be cached and
+        are analyzed in the request.
+
+        Returns:
+            Tuple of (analysis, job, error); exactly one is set
+        """
+        repo_path, error = EnhancedRepositoryService._get_repository_path(repo_id)
+        if error:
+            return None, None, error
+
+        start, error = EnhancedRepositoryService._resolve_subdirectory(repo_path, path)
+        if error:
+            return None, None, error
+        subtree = start != '.' or depth is not None
+
+        commit_sha = RepositoryService.get_head_commit(repo_path)
+        if not commit_sha:
+            if subtree:
+                analysis = EnhancedRepositoryService.analyze_subtree(repo_id, path, depth)
+            else:
+                analysis = EnhancedRepositoryService.analyze_repository_code(repo_id)
+            if 'error' in analysis:
+                return None, None, analysis['error']
+            return analysis, None, None
+
+        cached = AnalysisCacheService.get(repo_id, commit_sha, analysis_version())
+        if cached is not None:
+            if subtree:
+                return EnhancedRepositoryService._slice_tree(cached, start, depth), None, None
+            return cached, None, None
+
+        job = AnalysisJobService._current_job(repo_id, commit_sha)
+
+        # Shallow slices are cheap to build within the request, deep ones wait for the job
+        if job['status'] != JOB_FAILED and AnalysisJobService._is_inline_depth(depth):
+            analysis = EnhancedRepositoryService.analyze_subtree(repo_id, path, depth)
+            if 'error' in analysis:
+                return None, None, analysis['error']
+            return analysis, None, None
+
+        return None, job, None
+
+    @staticmethod
+    def request_stream(repo_id: str, path: Optional[str] = None, depth: Optional[int] = None) -> Tuple[Optional[Iterator[Dict]], Optional[Dict], Optional[str]]:
+        """
+        Get the flat nodes of an analysis to stream, or the job that is producing it.
+
+        Nodes come from the cached analysis when there is one; otherwise the
+        same cases as in request_analysis() stream from a walk within the request.
+
+        Returns:
+            Tuple of (nodes, job, error); exactly one is set
+        """
+        repo_path, error = EnhancedRepositoryService._get_repository_path(repo_id)
+        if error:
+            return None, None, error
+
+        start, error = EnhancedRepositoryService._resolve_subdirectory(repo_path, path)
+        if error:
+            return None, None, error
+
+        commit_sha = RepositoryService.get_head_commit(repo_path)
+        if commit_sha:
+            cached = AnalysisCacheService.get(repo_id, commit_sha, analysis_version())
+            if cached is not None:
+                return EnhancedRepositoryService._iter_tree_nodes(EnhancedRepositoryService._slice_tree(cached, start, depth)), None, None
+
+            job = AnalysisJobService._current_job(repo_id, commit_sha)
+            if job['status'] == JOB_FAILED or not AnalysisJobService._is_inline_depth(depth):
+                return None, job, None
+
+        return EnhancedRepositoryService._iter_analysis_nodes(repo_id, repo_path, start, depth), None, None
+
+    @staticmethod
+    def request_graph(repo_id: str) -> Tuple[Optional[Dict], Optional[Dict], Optional[str]]:
+        """
+        Get the dependency graph of a repository, or the job producing the analysis it is built from.
+
+        Returns:
+            Tuple of (graph, job, error); exactly one is set
+        """
+        repo_path, error = EnhancedRepositoryService._get_repository_path(repo_id)
+        if error:
+            return None, None, error
+
+        # The graph is built and cached together with the analysis
+        commit_sha = RepositoryService.get_head_commit(repo_path)
+        if commit_sha:
+            graph = AnalysisCacheService.get_graph(repo_id, commit_sha, analysis_version())
+            if graph is not None:
+                return graph, None, None
+
+        analysis, job, error = AnalysisJobService.request_analysis(repo_id)
+        if analysis is None:
+            return None, job, error
+
+        graph = DependencyGraphService.build_graph(analysis)
+        if commit_sha:
+            AnalysisCacheService.put_graph(repo_id, commit_sha, analysis_version(), graph)
+        return graph, None, None
+
+    @staticmethod
+    def start_job(repo_id: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Start a background analysis of a repository's HEAD commit.
+
+        Returns:
+            Tuple of the job, which is the one already in flight for the same
+            commit if there is one, and an error message
+        """
+        repo_path, error = EnhancedRepositoryService._get_repository_path(repo_id)
+        if error:
+            return None, error
+
+        return AnalysisJobService._start_job(repo_id, RepositoryService.get_head_commit(repo_path)), None
+
+    @staticmethod
+    def _start_job(repo_id: str, commit_sha: Optional[str]) -> Dict:
+        """Start a job for a commit of a repository unless one is already in flight."""
+        AnalysisJobService._ensure_indexes()
+        jobs = get_mongo().db.analysis_jobs
+        now = datetime.utcnow()
+        stale_after = timedelta(seconds=int(get_config('ANALYSIS_JOB_STALE_SECONDS', 900)))
+        job_id = ObjectId()
+
+        # A job whose worker died holds the commit's slot until it is marked failed
+        jobs.update_many(
+            {'repo_id': repo_id, 'commit_sha': commit_sha, 'active': True, 'updated_at': {'$lt': now - stale_after}},
+            {'$set': {
+                'status': JOB_FAILED,
+                'active': False,
+                'error': 'Analysis stopped reporting progress',
+                'updated_at': now,
+                'finished_at': now
+            }}
+        )
+
+        # Upsert so that concurrent requests, from any worker, share one job
+        try:
+            job = jobs.find_one_and_update(
+                {'repo_id': repo_id, 'commit_sha': commit_sha, 'active': True},
+                {'$setOnInsert': {
+                    '_id': job_id,
+                    'status': JOB_QUEUED,
+                    'analyzer_version': analysis_version(),
+                    'files_processed': 0,
+                    'files_truncated': 0,
+                    'truncated_files': [],
+                    'error': None,
+                    'created_at': now,
+                    'updated_at': now,
+                    'started_at': None,
+                    'finished_at': None
+                }},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Another request inserted the job between our lookup and insert
+            job = jobs.find_one({'repo_id': repo_id, 'commit_sha': commit_sha, 'active': True})
+            if job is None:
+                job = AnalysisJobService._find_latest_job(repo_id, commit_sha)
+
+        if job['_id'] == job_id:
+            app = current_app._get_current_object()
+            threading.Thread(target=AnalysisJobService._run_job, args=(app, job_id, repo_id), daemon=True).start()
+
+        return AnalysisJobService._format_job(job)
+
+    @staticmethod
+    def get_job(repo_id: str, job_id: str) -> Optional[Dict]:
+        """Get an analysis job of a repository by ID."""
+        try:
+            job = get_mongo().db.analysis_jobs.find_one({'_id': ObjectId(job_id), 'repo_id': repo_id})
+            return AnalysisJobService._format_job(job) if job else None
+        except Exception as e:
+            print(f"Error getting analysis job: {e}")
+            return None
+
+    @staticmethod
+    def get_budget_stats(limit: int = 20) -> Dict:
+        """
+        Aggregate the parse budget hits of completed analysis jobs.
+
+        Returns:
+            Dict with the number of completed jobs, the files they processed and
+            truncated, and the jobs with the most truncated files
+        """
+        try:
+            jobs = get_mongo().db.analysis_jobs
+            totals = next(iter(jobs.aggregate([
+                {'$match': {'status': JOB_COMPLETED}},
+                {'$group': {
+                    '_id': None,
+                    'jobs': {'$sum': 1},
+                    'files_processed': {'$sum': '$files_processed'},
+                    'files_truncated': {'$sum': '$files_truncated'}
+                }}
+            ])), {})
+
+            worst = jobs.find({'status': JOB_COMPLETED, 'files_truncated': {'$gt': 0}}).sort('files_truncated', -1).limit(limit)
+            return {
+                'jobs': totals.get('jobs', 0),
+                'files_processed': totals.get('files_processed', 0),
+                'files_truncated': totals.get('files_truncated', 0),
+                'repositories': [AnalysisJobService._format_job(job) for job in worst]
+            }
+        except Exception as e:
+            print(f"Error getting analysis budget stats: {e}")
+            return {'jobs': 0, 'files_processed': 0, 'files_truncated': 0, 'repositories': [], 'error': str(e)}
+
+    @staticmethod
+    def _current_job(repo_id: str, commit_sha: str) -> Dict:
+        """Get the failed job of a commit, which is reported until a new one is started with POST, or start one."""
+        latest = AnalysisJobService._find_latest_job(repo_id, commit_sha)
+        if latest and latest['status'] == JOB_FAILED:
+            return AnalysisJobService._format_job(latest)
+        return AnalysisJobService._start_job(repo_id, commit_sha)
+
+    @staticmethod
+    def _is_inline_depth(depth: Optional[int]) -> bool:
+        """Check that a slice is shallow enough to analyze within the request while the job runs."""
+        return depth is not None and depth <= int(get_config('ANALYSIS_MAX_INLINE_DEPTH', 2))
+
+    @staticmethod
+    def _find_latest_job(repo_id: str, commit_sha: str) -> Optional[Dict]:
+        """Get the most recently created job for a commit of a repository."""
+        jobs = get_mongo().db.analysis_jobs.find({'repo_id': repo_id, 'commit_sha': commit_sha}).sort('created_at', -1).limit(1)
+        return next(iter(jobs), None)
+
+    @staticmethod
+    def _run_job(app, job_id: ObjectId, repo_id: str):
+        """Run an analysis job and record its progress and outcome."""
+        with app.app_context():
+            jobs = get_mongo().db.analysis_jobs
+            last_update = time.monotonic()
+
+            def update(fields: Dict):
+                fields['updated_at'] = datetime.utcnow()
+                jobs.update_one({'_id': job_id}, {'$set': fields})
+
+            def progress(files_processed: int):
+                # Also serves as the heartbeat that keeps the job from going stale
+                nonlocal last_update
+                if time.monotonic() - last_update >= PROGRESS_INTERVAL_SECONDS:
+                    last_update = time.monotonic()
+                    update({'files_processed': files_processed})
+
+            try:
+                update({'status': JOB_RUNNING, 'started_at': datetime.utcnow()})
+                analysis = EnhancedRepositoryService.analyze_repository_code(repo_id, progress=progress)
+                if 'error' in analysis:
+                    update({'status': JOB_FAILED, 'active': False, 'error': analysis['error'], 'finished_at': datetime.utcnow()})
+                    return
+
+                file_count = 0
+                truncated_files = []
+                for node in EnhancedRepositoryService._iter_tree_nodes(analysis):
+                    if node['type'] == 'file':
+                        file_count += 1
+                        if node.get('truncated'):
+                            truncated_files.append(node['path'])
+
+                update({
+                    'status': JOB_COMPLETED,
+                    'active': False,
+                    'files_processed': file_count,
+                    'files_truncated': len(truncated_files),
+                    'truncated_files': truncated_files[:MAX_TRUNCATED_PATHS],
+                    'finished_at': datetime.utcnow()
+                })
+            except Exception as e:
+                print(f"Error running analysis job {job_id}: {e}")
+                update({'status': JOB_FAILED, 'active': False, 'error': str(e), 'finished_at': datetime.utcnow()})
+
+    @staticmethod
+    def _format_job(job: Dict) -> Dict:
+        """Convert a job document to its API representation."""
+        job_id = str(job['_id'])
+        repo_id = job['repo_id']
+        return {
+            'job_id': job_id,
+            'repo_id': repo_id,
+            'commit_sha': job.get('commit_sha'),
+            'status': job['status'],
+            'files_processed': job.get('files_processed', 0),
+            'files_truncated': job.get('files_truncated', 0),
+            'truncated_files': job.get('truncated_files', []),
+            'error': job.get('error'),
+            'created_at': job.get('created_at'),
+            'started_at': job.get('started_at'),
+            'finished_at': job.get('finished_at'),
+            'status_url': f"/api/repositories/{repo_id}/analysis/{job_id}",
+            'result_url': f"/api/repositories/{repo_id}/analyze"
+        }
@@ -0,0 +1,198 @@
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.repository_service import RepositoryService
+
+# Edge types, stored in the graph as indexes into this tuple
+EDGE_TYPES = ('import', 'calls')
+IMPORT_EDGE = 0
+CALL_EDGE = 1
+
+
+class DependencyGraphService:
+    """
+    Builds and queries the dependency graph of an analyzed repository.
+
+    The graph is stored in compressed sparse row form: 'nodes' lists the file,
+    function and method nodes, and the edges leaving node i are
+    targets[offsets[i]:offsets[i + 1]] with their types at the same positions of
+    'edge_types'. Each file node is directly followed by the nodes of its
+    functions and methods, so all edges of a file are one contiguous slice;
+    'file_ranges' maps file paths to the [start, end) indexes of their nodes.
+    """
+
+    @staticmethod
+    def build_graph(file_tree: Dict) -> Dict:
+        """
+        Build the dependency graph of an analyzed file tree.
+
+        File nodes are linked by 'import' edges for imports resolved to files in
+        the repository, and function and method nodes by 'calls' edges for calls
+        resolved to a function or method of a file in the repository.
+        """
+        nodes = []
+        file_indexes = {}
+        file_ranges = {}
+        symbol_indexes = {}
+        sources = []
+
+        # First pass: number the nodes, so edges can point forward
+        for file_node in DependencyGraphService._iter_files(file_tree):
+            path = file_node['path']
+            language = RepositoryService._get_language_from_extension(os.path.splitext(path)[1])
+            file_index = len(nodes)
+            file_indexes[path] = file_index
+            nodes.append({
+                'id': path,
+                'name': file_node['name'],
+                'type': 'file',
+                'path': path,
+                'size': file_node.get('size', 0),
+                'language': language
+            })
+
+            symbols = {}
+            node_ids = {}
+            callers = []
+            method_keys = set()
+            for class_entry in file_node.get('classes', []):
+                for method in class_entry.get('methods', []):
+                    method_keys.add((method['name'], method.get('start_line')))
+                    node_id = f"{path}:{class_entry['name']}.{method['name']}"
+                    callers.append((DependencyGraphService._add_symbol_node(nodes, node_ids, node_id, method, 'method', path, language), method))
+
+            for function in file_node.get('functions', []):
+                # Python reports methods as functions too; keep only the method node
+                if (function['name'], function.get('start_line')) in method_keys:
+                    continue
+                node_id = f"{path}:{function['name']}"
+                index = DependencyGraphService._add_symbol_node(nodes, node_ids, node_id, function, 'function', path, language)
+                callers.append((index, function))
+                symbols.setdefault(function['name'], index)
+
+            # Calls resolve to functions first, then to methods by their bare name
+            for index, entry in callers:
+                if nodes[index]['type'] == 'method':
+                    symbols.setdefault(entry['name'], index)
+
+            symbol_indexes[path] = symbols
+            file_ranges[path] = [file_index, len(nodes)]
+            sources.append((file_index, file_node, callers))
+
+        # Second pass: collect each node's edges, in node order
+        adjacency = [[] for _ in nodes]
+        for file_index, file_node, callers in sources:
+            for imported in file_node.get('imports', []):
+                if imported.get('type') != 'file':
+                    continue
+                target = file_indexes.get(imported['source'])
+                if target is not None:
+                    adjacency[file_index].append((target, IMPORT_EDGE))
+
+            for index, entry in callers:
+                for dependency in entry.get('dependencies', []):
+                    # Unresolved calls keep a bare name and get no edge
+                    target_path, _, name = dependency['target'].rpartition('#')
+                    target = symbol_indexes.get(target_path, {}).get(name)
+                    if target is not None:
+                        adjacency[index].append((target, CALL_EDGE))
+
+        offsets = [0]
+        targets = []
+        edge_types = []
+        for edges in adjacency:
+            # One edge per (target, type) in the order first seen
+            for target, edge_type in dict.fromkeys(edges):
+                targets.append(target)
+                edge_types.append(edge_type)
+            offsets.append(len(targets))
+
+        return {
+            'nodes': nodes,
+            'offsets': offsets,
+            'targets': targets,
+            'edge_types': edge_types,
+            'edge_type_names': list(EDGE_TYPES),
+            'file_ranges': file_ranges
+        }
+
+    @staticmethod
+    def _iter_files(file_tree: Dict) -> Iterator[Dict]:
+        """Yield the file nodes of a tree in walk order."""
+        stack = [file_tree]
+        while stack:
+            directory = stack.pop()
+            children = directory.get('children', [])
+            for child in children:
+                if child['type'] == 'file':
+                    yield child
+            stack.extend(reversed([child for child in children if child['type'] == 'directory']))
+
+    @staticmethod
+    def _add_symbol_node(nodes: List[Dict], node_ids: Dict[str, int], node_id: str, entry: Dict, node_type: str, path: str, language: Optional[str]) -> int:
+        """Append a function or method node, reusing the node of an earlier entry with the same id."""
+        if node_id in node_ids:
+            return node_ids[node_id]
+
+        node_ids[node_id] = len(nodes)
+        nodes.append({
+            'id': node_id,
+            'name': entry['name'],
+            'type': node_type,
+            'path': path,
+            'language': language,
+            'start_line': entry.get('start_line'),
+            'end_line': entry.get('end_line')
+        })
+        return len(nodes) - 1
+
+    @staticmethod
+    def get_node_range(graph: Dict, file_path: str) -> Optional[Tuple[int, int]]:
+        """Get the [start, end) node index range of a file and its functions, or None if unknown."""
+        node_range = graph['file_ranges'].get(file_path)
+        return tuple(node_range) if node_range else None
+
+    @staticmethod
+    def get_edges(graph: Dict, file_path: Optional[str] = None) -> List[Dict]:
+        """
+        List the edges of a graph as {'source', 'target', 'type'} dicts.
+
+        Args:
+            graph: Graph built by build_graph()
+            file_path: Only list edges leaving this file and its functions
+        """
+        nodes = graph['nodes']
+        offsets = graph['offsets']
+        targets = graph['targets']
+        edge_types = graph['edge_types']
+        type_names = graph.get('edge_type_names', EDGE_TYPES)
+
+        start, end = 0, len(nodes)
+        if file_path is not None:
+            node_range = DependencyGraphService.get_node_range(graph, file_path)
+            if node_range is None:
+                return []
+            start, end = node_range
+
+        edges = []
+        for source in range(start, end):
+            source_id = nodes[source]['id']
+            for position in range(offsets[source], offsets[source + 1]):
+                edges.append({
+                    'source': source_id,
+                    'target': nodes[targets[position]]['id'],
+                    'type': type_names[edge_types[position]]
+                })
+        return edges
+
+    @staticmethod
+    def get_functions(graph: Dict, file_path: Optional[str] = None) -> List[Dict]:
+        """List the function and method nodes of a graph, optionally of a single file."""
+        nodes = graph['nodes']
+        start, end = 0, len(nodes)
+        if file_path is not None:
+            node_range = DependencyGraphService.get_node_range(graph, file_path)
+            if node_range is None:
+                return []
+            start, end = node_range
+        return [node for node in nodes[start:end] if node['type'] != 'file']
@@ -1,375 +1,374 @@
 import os
-import re
-import ast
-from typing import Dict, List, Tuple, Optional
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Optional
 from app.services.repository_service import RepositoryService
+from app.services.analysis_cache_service import AnalysisCacheService
+from app.services.dependency_graph_service import DependencyGraphService
+from app.services.reference_resolver import ReferenceResolver
+from app.utils.config_utils import get_config
+from app.utils.language_extractors import LanguageExtractor
+from app.utils.path_filter import PathFilter
+from app.utils.repo_walker import entry_depth, is_walkable_directory, normalize_subdirectory, walk_directories
+
+# Bump whenever the analysis output changes so stale cache entries are not served
+ANALYZER_VERSION = '16'
+
+# Settings that change the analysis output, folded into analysis_version()
+ANALYSIS_OUTPUT_SETTINGS = (
+    ('ANALYSIS_IGNORE_DIRS', None),
+    ('ANALYSIS_MAX_FILE_BYTES', 1024 * 1024),
+    ('ANALYSIS_FILE_BUDGET_SECONDS', 5.0),
+)
+
+
+def analysis_version() -> str:
+    """Get the version cached analyses and their ETags are keyed by: ANALYZER_VERSION and a hash of the output settings."""
+    settings = repr([get_config(name, default) for name, default in ANALYSIS_OUTPUT_SETTINGS])
+    return f"{ANALYZER_VERSION}-{hashlib.sha1(settings.encode('utf-8')).hexdigest()[:8]}"
+
 
 class EnhancedRepositoryService:
     @staticmethod
-    def analyze_repository_code(repo_id: str) -> Dict:
-        """Analyze repository code structure and dependencies with enhanced output."""
+    def analyze_repository_code(repo_id: str, progress: Optional[Callable[[int], None]] = None) -> Dict:
+        """
+        Analyze repository code structure and dependencies with enhanced output.
+
+        Args:
+            repo_id: Repository ID
+            progress: Called with the number of files processed so far while a
+                fresh analysis runs
+        """
+        repo_path, error = EnhancedRepositoryService._get_repository_path(repo_id)
+        if error:
+            return {'error': error}
+        
+        # Serve unchanged repositories from the analysis cache
+        commit_sha = RepositoryService.get_head_commit(repo_path)
+        if commit_sha:
+            cached = AnalysisCacheService.get(repo_id, commit_sha, analysis_version())
+            if cached is not None:
+                return cached
+        
+        # Re-parse only files that changed since the previous analysis
+        manifest = AnalysisCacheService.get_manifest(repo_id, analysis_version())
+        file_tree, manifest = EnhancedRepositoryService._build_analysis(repo_path, manifest, progress)
+        AnalysisCacheService.put_manifest(repo_id, analysis_version(), manifest)
+        
+        if commit_sha:
+            AnalysisCacheService.put(repo_id, commit_sha, analysis_version(), file_tree)
+            AnalysisCacheService.put_graph(repo_id, commit_sha, analysis_version(), DependencyGraphService.build_graph(file_tree))
+        
+        return file_tree
+
+    @staticmethod
+    def analyze_subtree(repo_id: str, path: Optional[str] = None, depth: Optional[int] = None) -> Dict:
+        """Analyze one directory of a repository, optionally only depth levels deep, slicing the cached analysis if there is one."""
+        repo_path, error = EnhancedRepositoryService._get_repository_path(repo_id)
+        if error:
+            return {'error': error}
+        
+        start, error = EnhancedRepositoryService._resolve_subdirectory(repo_path, path)
+        if error:
+            return {'error': error}
+        
+        commit_sha = RepositoryService.get_head_commit(repo_path)
+        cached = AnalysisCacheService.get(repo_id, commit_sha, analysis_version()) if commit_sha else None
+        if cached is not None:
+            return EnhancedRepositoryService._slice_tree(cached, start, depth)
+        
+        manifest = AnalysisCacheService.get_manifest(repo_id, analysis_version())
+        subtree, _ = EnhancedRepositoryService._build_analysis(repo_path, manifest, start=start, max_depth=depth)
+        return subtree
+
+    @staticmethod
+    def _get_repository_path(repo_id: str) -> Tuple[Optional[str], Optional[str]]:
+        """Get the clone path of a repository, or an error message."""
         repo = RepositoryService.get_repository(repo_id)
         if not repo:
-            return {'error': 'Repository not found'}
+            return None, 'Repository not found'
         
         repo_path = repo.get('repo_path') if isinstance(repo, dict) else repo.repo_path
         if not repo_path or not os.path.exists(repo_path):
-            return {'error': 'Repository directory not found'}
+            return None, 'Repository directory not found'
         
-        # Build file tree
-        file_tree = {
-            'name': 'root',
-            'type': 'directory',
-            'path': '/',
-            'children': []
-        }
+        return repo_path, None
+
+    @staticmethod
+    def _resolve_subdirectory(repo_path: str, path: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Get the walk start of a requested directory ('.' for the whole repository), or an error message."""
+        start = normalize_subdirectory(path)
+        if not is_walkable_directory(repo_path, start, path_filter=PathFilter.for_repository(repo_path)):
+            return None, 'Directory not found'
+        return start, None
+
+    @staticmethod
+    def _subtree_root(start: str) -> Dict:
+        """Create the directory node an analysis starting at start is built under."""
+        if start == '.':
+            return {'name': 'root', 'type': 'directory', 'path': '/', 'children': []}
+        return {'name': start.rsplit('/', 1)[-1], 'type': 'directory', 'path': '/' + start, 'children': []}
+
+    @staticmethod
+    def _slice_tree(file_tree: Dict, start: str, depth: Optional[int] = None) -> Dict:
+        """
+        Get the subtree of an analyzed tree at a walk start, cut depth levels deep.
+
+        The result has the same shape as a fresh subtree analysis; nodes below the
+        cut are left out and the cut directories get 'expanded': False.
+        """
+        node = file_tree
+        if start != '.':
+            parts = start.split('/')
+            for index in range(len(parts)):
+                tree_path = '/' + '/'.join(parts[:index + 1])
+                node = next((child for child in node.get('children', []) if child['path'] == tree_path and child['type'] == 'directory'), None)
+                if node is None:
+                    # Listed by the walker but missing from the cached tree; return it empty
+                    return EnhancedRepositoryService._subtree_root(start)
         
-        # Process all files and directories
-        for root, dirs, files in os.walk(repo_path):
-            # Skip .git directory
-            if '.git' in dirs:
-                dirs.remove('.git')
-            
-            # Get relative path from repo root
-            rel_path = os.path.relpath(root, repo_path)
-            current_dir = file_tree if rel_path == '.' else EnhancedRepositoryService._get_or_create_dir_node(file_tree, rel_path)
-            
-            # Process directories
-            for dir_name in dirs:
-                dir_path = os.path.join(rel_path, dir_name)
-                if dir_path == '.':
-                    continue
-                
-                dir_node = {
-                    'name': dir_name,
-                    'type': 'directory',
-                    'path': '/' + dir_path.replace('\\', '/'),
-                    'children': []
-                }
-                current_dir['children'].append(dir_node)
-            
-            # Process files
-            for file_name in files:
-                file_path = os.path.join(root, file_name)
-                rel_file_path = os.path.relpath(file_path, repo_path)
-                abs_file_path = os.path.join(repo_path, rel_file_path)
-                
-                # Create file node
-                file_node = {
-                    'name': file_name,
-                    'type': 'file',
-                    'path': '/' + rel_file_path.replace('\\', '/'),
-                    'extension': os.path.splitext(file_name)[1][1:] if os.path.splitext(file_name)[1] else '',
-                    'size': os.path.getsize(abs_file_path)
-                }
-                
-                # Extract functions and classes if it's a supported file type
-                if file_name.endswith(('.js', '.jsx', '.ts', '.tsx', '.py', '.java')):
-                    functions, classes = EnhancedRepositoryService._extract_functions_and_classes(abs_file_path, file_node['path'])
-                    if functions:
-                        file_node['functions'] = functions
-                    if classes:
-                        file_node['classes'] = classes
-                
-                # Extract imports
-                imports = EnhancedRepositoryService._extract_imports(abs_file_path, file_node['path'], repo_path)
-                if imports:
-                    file_node['imports'] = imports
-                
-                current_dir['children'].append(file_node)
+        if depth is None:
+            return node
         
-        return file_tree
+        def cut(directory: Dict, level: int) -> Dict:
+            copied = {key: value for key, value in directory.items() if key != 'children'}
+            if level >= depth:
+                copied['children'] = []
+                copied['expanded'] = False
+            else:
+                copied['children'] = [cut(child, level + 1) if child['type'] == 'directory' else child for child in directory.get('children', [])]
+            return copied
+        
+        # The requested directory itself is always expanded
+        root = {key: value for key, value in node.items() if key != 'children'}
+        root['children'] = [cut(child, 1) if child['type'] == 'directory' else child for child in node.get('children', [])]
+        return root
 
     @staticmethod
-    def _get_or_create_dir_node(root: Dict, path: str) -> Dict:
-        """Get or create a directory node in the tree."""
-        if path == '.' or path == '':
-            return root
+    def _iter_analysis_nodes(repo_id: str, repo_path: str, start: str = '.', depth: Optional[int] = None) -> Iterator[Dict]:
+        """Yield the flat nodes of a repository analysis in walk order, from the cache if possible."""
+        commit_sha = RepositoryService.get_head_commit(repo_path)
+        cached = AnalysisCacheService.get(repo_id, commit_sha, analysis_version()) if commit_sha else None
+        if cached is not None:
+            yield from EnhancedRepositoryService._iter_tree_nodes(EnhancedRepositoryService._slice_tree(cached, start, depth))
+            return
         
-        parts = path.split(os.sep)
-        current = root
+        yield {key: value for key, value in EnhancedRepositoryService._subtree_root(start).items() if key != 'children'}
+        manifest = AnalysisCacheService.get_manifest(repo_id, analysis_version())
+        for _, nodes in EnhancedRepositoryService._iter_analysis_batches(repo_path, manifest, start=start, max_depth=depth):
+            for node in nodes:
+                if node['type'] == 'directory':
+                    node = {key: value for key, value in node.items() if key != 'children'}
+                yield node
+
+    @staticmethod
+    def _iter_tree_nodes(file_tree: Dict) -> Iterator[Dict]:
+        """Yield the nodes of a file tree as flat dicts, in the same order as a fresh walk."""
+        yield {key: value for key, value in file_tree.items() if key != 'children'}
         
-        for part in parts:
-            found = False
-            for child in current['children']:
-                if child['name'] == part and child['type'] == 'directory':
-                    current = child
-                    found = True
-                    break
+        stack = [iter([file_tree])]
+        while stack:
+            directory = next(stack[-1], None)
+            if directory is None:
+                stack.pop()
+                continue
             
-            if not found:
-                new_dir = {
-                    'name': part,
-                    'type': 'directory',
-                    'path': '/' + os.path.join(*parts[:parts.index(part) + 1]).replace('\\', '/'),
-                    'children': []
-                }
-                current['children'].append(new_dir)
-                current = new_dir
+            children = directory.get('children', [])
+            for child in children:
+                if child['type'] == 'directory':
+                    yield {key: value for key, value in child.items() if key != 'children'}
+                else:
+                    yield child
+            stack.append(iter([child for child in children if child['type'] == 'directory']))
+
+    @staticmethod
+    def _build_analysis(repo_path: str, manifest: Optional[Dict] = None, progress: Optional[Callable[[int], None]] = None,
+                        start: str = '.', max_depth: Optional[int] = None) -> Tuple[Dict, Dict]:
+        """
+        Walk a repository and build its analyzed file tree.
+
+        Args:
+            repo_path: Path of the cloned repository
+            manifest: Manifest of a previous analysis, mapping file paths to their
+                size, mtime, content hash and extraction result
+            progress: Called with the number of files processed after each directory
+            start: Directory to analyze, relative to the repository root
+            max_depth: Only analyze this many levels below start
+
+        Returns:
+            Tuple of the file tree and the manifest for the files analyzed now
+        """
+        new_manifest = {}
+        
+        # Build file tree
+        file_tree = EnhancedRepositoryService._subtree_root(start)
         
-        return current
+        dir_index = {file_tree['path']: file_tree}
+        file_count = 0
+        
+        for rel_path, nodes in EnhancedRepositoryService._iter_analysis_batches(repo_path, manifest, new_manifest, start, max_depth):
+            current_dir = RepositoryService._get_or_create_dir_node(file_tree, rel_path, dir_index)
+            current_dir['children'].extend(nodes)
+            for node in nodes:
+                if node['type'] == 'directory':
+                    dir_index[node['path']] = node
+                else:
+                    file_count += 1
+            if progress is not None:
+                progress(file_count)
+        
+        # Imports and calls can only be resolved across files once every file is analyzed
+        ReferenceResolver.resolve(file_tree, repo_path)
+        
+        return file_tree, new_manifest
 
     @staticmethod
-    def _extract_functions_and_classes(file_path: str, file_rel_path: str) -> Tuple[List[Dict], List[Dict]]:
-        """Extract functions and classes from a file."""
-        functions = []
-        classes = []
+    def _iter_analysis_batches(repo_path: str, manifest: Optional[Dict] = None, new_manifest: Optional[Dict] = None,
+                               start: str = '.', max_depth: Optional[int] = None) -> Iterator[Tuple[str, List[Dict]]]:
+        """Walk a repository and yield (relative directory path, child nodes) batches in walk order."""
+        previous_manifest = manifest or {}
+        parsed_file_count = 0
+        reused_count = 0
+        truncated_count = 0
         
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # JavaScript/TypeScript
-            if file_path.endswith(('.js', '.jsx', '.ts', '.tsx')):
-                # Extract functions
-                function_patterns = [
-                    r'(?:export\s+)?(?:async\s+)?function\s+(\w+)',  # function declarations
-                    r'(?:export\s+)?const\s+(\w+)\s*=\s*(?:async\s+)?function',  # function expressions
-                    r'(?:export\s+)?const\s+(\w+)\s*=\s*(?:async\s+)?\(',  # arrow functions
-                ]
-                
-                for pattern in function_patterns:
-                    for match in re.finditer(pattern, content):
-                        func_name = match.group(1)
-                        # Find function dependencies
-                        func_content = EnhancedRepositoryService._get_function_content(content, match.end())
-                        dependencies = EnhancedRepositoryService._extract_function_dependencies(func_content, file_rel_path)
-                        
-                        functions.append({
-                            'name': func_name,
-                            'type': 'function',
-                            'dependencies': dependencies
-                        })
+        # Dependency and build directories, .gitignore'd paths and .git are not walked
+        path_filter = PathFilter.for_repository(repo_path)
+        max_file_bytes = int(get_config('ANALYSIS_MAX_FILE_BYTES', 1024 * 1024))
+        
+        def walk() -> Iterator[Tuple[Tuple[str, List[Dict], List[Tuple]], List[Tuple]]]:
+            nonlocal parsed_file_count, reused_count
+            for rel_path, entries in walk_directories(repo_path, path_filter=path_filter, start=start, max_depth=max_depth):
+                nodes = []
+                pending_nodes = []
+                tasks = []
                 
-                # Extract classes
-                class_pattern = r'(?:export\s+)?class\s+(\w+)'
-                for match in re.finditer(class_pattern, content):
-                    class_name = match.group(1)
-                    class_content = EnhancedRepositoryService._get_class_content(content, match.end())
-                    
-                    # Extract methods
-                    method_pattern = r'(?:async\s+)?(\w+)\s*\([^)]*\)\s*{'
-                    methods = []
-                    
-                    for method_match in re.finditer(method_pattern, class_content):
-                        method_name = method_match.group(1)
-                        if method_name not in ['constructor', 'get', 'set']:
-                            method_content = EnhancedRepositoryService._get_function_content(class_content, method_match.end())
-                            dependencies = EnhancedRepositoryService._extract_function_dependencies(method_content, file_rel_path)
-                            
-                            methods.append({
-                                'name': method_name,
-                                'type': 'method',
-                                'dependencies': dependencies
-                            })
-                    
-                    classes.append({
-                        'name': class_name,
-                        'type': 'class',
-                        'methods': methods
-                    })
-            
-            # Python
-            elif file_path.endswith('.py'):
-                try:
-                    tree = ast.parse(content)
+                for entry in entries:
+                    name = entry.path.rsplit('/', 1)[-1]
                     
-                    for node in ast.walk(tree):
-                        # Extract functions
-                        if isinstance(node, ast.FunctionDef):
-                            dependencies = []
-                            for child in ast.walk(node):
-                                if isinstance(child, ast.Call) and isinstance(child.func, ast.Name):
-                                    dependencies.append({
-                                        'target': child.func.id,
-                                        'type': 'call',
-                                        'line': child.lineno
-                                    })
-                            
-                            functions.append({
-                                'name': node.name,
-                                'type': 'function',
-                                'dependencies': dependencies
-                            })
-                        
-                        # Extract classes
-                        elif isinstance(node, ast.ClassDef):
-                            methods = []
-                            for child in node.body:
-                                if isinstance(child, ast.FunctionDef):
-                                    method_deps = []
-                                    for method_child in ast.walk(child):
-                                        if isinstance(method_child, ast.Call) and isinstance(method_child.func, ast.Name):
-                                            method_deps.append({
-                                                'target': method_child.func.id,
-                                                'type': 'call',
-                                                'line': method_child.lineno
-                                            })
-                                    
-                                    methods.append({
-                                        'name': child.name,
-                                        'type': 'method',
-                                        'dependencies': method_deps
-                                    })
-                            
-                            classes.append({
-                                'name': node.name,
-                                'type': 'class',
-                                'methods': methods
-                            })
-                except SyntaxError:
-                    pass
-            
-            # Java
-            elif file_path.endswith('.java'):
-                # Extract classes
-                class_pattern = r'(?:public|private|protected)?\s*class\s+(\w+)'
-                for match in re.finditer(class_pattern, content):
-                    class_name = match.group(1)
-                    class_content = EnhancedRepositoryService._get_class_content(content, match.end())
+                    if entry.is_dir:
+                        dir_node = {
+                            'name': name,
+                            'type': 'directory',
+                            'path': '/' + entry.path,
+                            'children': []
+                        }
+                        if max_depth is not None and entry_depth(entry.path, start) >= max_depth:
+                            dir_node['expanded'] = False
+                        nodes.append(dir_node)
+                        continue
                     
-                    # Extract methods
-                    method_pattern = r'(?:public|private|protected)?\s+(?:static\s+)?[\w<>[\]]+\s+(\w+)\s*\([^)]*\)\s*{'
-                    methods = []
-                    
-                    for method_match in re.finditer(method_pattern, class_content):
-                        method_name = method_match.group(1)
-                        method_content = EnhancedRepositoryService._get_function_content(class_content, method_match.end())
-                        dependencies = EnhancedRepositoryService._extract_function_dependencies(method_content, file_rel_path)
-                        
-                        methods.append({
-                            'name': method_name,
-                            'type': 'method',
-                            'dependencies': dependencies
-                        })
+                    # Queue supported file types for function, class and import extraction
+                    file_node, extractor = RepositoryService._build_file_node(entry, max_file_bytes)
+                    if extractor is not None:
+                        parsed_file_count += 1
+                        previous = previous_manifest.get(file_node['path'])
+                        if previous and previous['size'] == entry.size and previous['mtime'] == entry.mtime:
+                            # Unchanged since the last analysis, reuse without reading the file
+                            file_node.update(previous['result'])
+                            if new_manifest is not None:
+                                new_manifest[file_node['path']] = previous
+                            reused_count += 1
+                        else:
+                            pending_nodes.append((file_node, entry, previous))
+                            tasks.append((os.path.join(repo_path, entry.path), file_node['path'], extractor, previous['hash'] if previous else None))
                     
-                    classes.append({
-                        'name': class_name,
-                        'type': 'class',
-                        'methods': methods
-                    })
+                    nodes.append(file_node)
+                
+                yield (rel_path, nodes, pending_nodes), tasks
         
-        except Exception as e:
-            print(f"Error extracting functions and classes from {file_path}: {e}")
+        # Results come back per directory in walk order, so the output does not
+        # depend on whether the files were analyzed serially or in parallel
+        for (rel_path, nodes, pending_nodes), results in EnhancedRepositoryService._analyze_directories(walk()):
+            for (file_node, entry, previous), (content_hash, result) in zip(pending_nodes, results):
+                if result is None:
+                    # Touched but identical content, reuse the previous result
+                    result = previous['result']
+                    reused_count += 1
+                file_node.update(result)
+                if result.get('truncated'):
+                    truncated_count += 1
+                # Files that were not read in full (read errors, binary files) are
+                # left out so the next analysis reads them again
+                if new_manifest is not None and content_hash is not None:
+                    new_manifest[file_node['path']] = {
+                        'size': entry.size,
+                        'mtime': entry.mtime,
+                        'hash': content_hash,
+                        'result': result
+                    }
+            yield rel_path, nodes
         
-        return functions, classes
+        if previous_manifest:
+            print(f"Incremental analysis of {repo_path}: reused {reused_count} of {parsed_file_count} files")
+        if truncated_count:
+            print(f"Analysis of {repo_path}: parse budget exceeded for {truncated_count} files")
 
     @staticmethod
-    def _extract_imports(file_path: str, file_rel_path: str, repo_path: str) -> List[Dict]:
-        """Extract imports from a file."""
-        imports = []
+    def _analyze_directories(directories: Iterator[Tuple[Any, List[Tuple]]]) -> Iterator[Tuple[Any, List[Tuple[Optional[str], Optional[Dict]]]]]:
+        """Run per-file extraction for (batch, tasks) pairs, serially or in a process pool, and yield (batch, results) in order."""
+        workers = int(get_config('ANALYSIS_WORKERS', 1) or 1)
+        min_files = int(get_config('ANALYSIS_PARALLEL_MIN_FILES', 200))
+        chunk_size = max(1, int(get_config('ANALYSIS_CHUNK_SIZE', 64)))
+        budget_seconds = float(get_config('ANALYSIS_FILE_BUDGET_SECONDS', 5.0))
+        # Files (and directories) the pool may run ahead of the consumer
+        max_in_flight = workers * chunk_size * 2
+        
+        executor = None
+        in_flight = deque()
+        in_flight_files = 0
+        serial_files = 0
+        
+        def finish(tasks: List[Tuple], chunks: List) -> List[Tuple[Optional[str], Optional[Dict]]]:
+            nonlocal executor, workers
+            if executor is not None:
+                try:
+                    return [result for chunk in chunks for result in chunk.result()]
+                except Exception as e:
+                    print(f"Parallel analysis failed, falling back to serial analysis: {e}")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = None
+                    workers = 1
+            return [_analyze_file_task(task, budget_seconds) for task in tasks]
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # JavaScript/TypeScript imports
-            if file_path.endswith(('.js', '.jsx', '.ts', '.tsx')):
-                import_patterns = [
-                    (r'import\s+{([^}]+)}\s+from\s+[\'"]([^\'"]+)[\'"]', True),  # Named imports
-                    (r'import\s+(\w+)\s+from\s+[\'"]([^\'"]+)[\'"]', False),  # Default imports
-                    (r'import\s+\*\s+as\s+(\w+)\s+from\s+[\'"]([^\'"]+)[\'"]', False),  # Namespace imports
-                ]
+            for batch, tasks in directories:
+                if executor is None and workers > 1 and serial_files >= min_files:
+                    try:
+                        executor = ProcessPoolExecutor(max_workers=workers)
+                    except Exception as e:
+                        print(f"Parallel analysis failed, falling back to serial analysis: {e}")
+                        workers = 1
                 
-                for pattern, is_named in import_patterns:
-                    for match in re.finditer(pattern, content):
-                        if is_named:
-                            symbols = [s.strip() for s in match.group(1).split(',')]
-                            module = match.group(2)
-                        else:
-                            symbols = [match.group(1)]
-                            module = match.group(2)
-                        
-                        resolved_path = RepositoryService._resolve_js_dependency(module, file_path, repo_path)
-                        if resolved_path:
-                            imports.append({
-                                'source': '/' + resolved_path.replace('\\', '/'),
-                                'type': 'file',
-                                'symbols': symbols
-                            })
-            
-            # Python imports
-            elif file_path.endswith('.py'):
-                try:
-                    tree = ast.parse(content)
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.Import):
-                            for name in node.names:
-                                imports.append({
-                                    'source': name.name,
-                                    'type': 'module',
-                                    'symbols': [name.asname or name.name]
-                                })
-                        elif isinstance(node, ast.ImportFrom):
-                            module = node.module or ''
-                            imports.append({
-                                'source': module,
-                                'type': 'module',
-                                'symbols': [n.name for n in node.names]
-                            })
-                except SyntaxError:
-                    pass
+                if executor is None:
+                    serial_files += len(tasks)
+                    chunks = []
+                else:
+                    chunks = [executor.submit(_analyze_file_chunk, tasks[i:i + chunk_size], budget_seconds) for i in range(0, len(tasks), chunk_size)]
+                in_flight.append((batch, tasks, chunks))
+                in_flight_files += len(tasks)
+                
+                # Yield finished directories, waiting on the oldest one while the window is full
+                while in_flight and (executor is None or all(chunk.done() for chunk in in_flight[0][2])
+                                     or in_flight_files > max_in_flight or len(in_flight) > max_in_flight):
+                    batch, tasks, chunks = in_flight.popleft()
+                    in_flight_files -= len(tasks)
+                    yield batch, finish(tasks, chunks)
             
-            # Java imports
-            elif file_path.endswith('.java'):
-                import_pattern = r'import\s+([^;]+);'
-                for match in re.finditer(import_pattern, content):
-                    import_path = match.group(1)
-                    imports.append({
-                        'source': import_path,
-                        'type': 'package',
-                        'symbols': [import_path.split('.')[-1]]
-                    })
-        
-        except Exception as e:
-            print(f"Error extracting imports from {file_path}: {e}")
-        
-        return imports
+            while in_flight:
+                batch, tasks, chunks = in_flight.popleft()
+                yield batch, finish(tasks, chunks)
+        finally:
+            if executor is not None:
+                # Do not wait for queued work if the consumer went away
+                executor.shutdown(wait=False, cancel_futures=True)
 
-    @staticmethod
-    def _get_function_content(content: str, start_pos: int) -> str:
-        """Get the content of a function."""
-        brace_count = 0
-        in_string = False
-        string_char = None
-        
-        for i, char in enumerate(content[start_pos:], start_pos):
-            if char in ['"', "'"]:
-                if not in_string:
-                    in_string = True
-                    string_char = char
-                elif string_char == char:
-                    in_string = False
-            elif not in_string:
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        return content[start_pos:i + 1]
-        
-        return content[start_pos:]
 
-    @staticmethod
-    def _get_class_content(content: str, start_pos: int) -> str:
-        """Get the content of a class."""
-        return EnhancedRepositoryService._get_function_content(content, start_pos)
+def _analyze_file_task(task: Tuple[str, str, LanguageExtractor, Optional[str]], budget_seconds: Optional[float] = None) -> Tuple[Optional[str], Optional[Dict]]:
+    """Analyze one file."""
+    return RepositoryService._analyze_file(*task, budget_seconds=budget_seconds)
 
-    @staticmethod
-    def _extract_function_dependencies(content: str, file_path: str) -> List[Dict]:
-        """Extract function dependencies from function content."""
-        dependencies = []
-        
-        # Extract function calls
-        call_pattern = r'(\w+)\s*\('
-        for match in re.finditer(call_pattern, content):
-            func_name = match.group(1)
-            # Skip common built-in functions and keywords
-            if func_name not in ['if', 'for', 'while', 'switch', 'catch']:
-                dependencies.append({
-                    'target': f"{file_path}#{func_name}",
-                    'type': 'call',
-                    'line': content[:match.start()].count('\n') + 1
-                })
-        
-        return dependencies 
\ No newline at end of file
+
+def _analyze_file_chunk(tasks: List[Tuple[str, str, LanguageExtractor, Optional[str]]], budget_seconds: Optional[float] = None) -> List[Tuple[Optional[str], Optional[Dict]]]:
+    """Analyze a chunk of files; module level so process pool workers can unpickle it."""
+    return [_analyze_file_task(task, budget_seconds) for task in tasks]
@@ -0,0 +1,331 @@
+import os
+import re
+import json
+import posixpath
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Extensions probed for extensionless JavaScript/TypeScript specifiers, in order
+JS_RESOLVE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs')
+JS_SOURCE_EXTENSIONS = ('.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs')
+
+# Conditions read from package.json "exports", in order of preference
+PACKAGE_EXPORT_CONDITIONS = ('import', 'module', 'require', 'node', 'default', 'browser')
+
+# Strings, and comments or trailing commas outside them, in tsconfig-style JSON
+_JSONC_TOKEN = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/|,(?=\s*[}\]])', re.DOTALL)
+
+
+def load_jsonc(text: str) -> Dict:
+    """Parse JSON that may contain comments and trailing commas, as tsconfig.json does."""
+    return json.loads(_JSONC_TOKEN.sub(lambda match: match.group(1) or '', text))
+
+
+class ImportResolver:
+    """
+    Resolves the imports of analyzed files to files of the same repository.
+
+    The index is built once per analysis from the set of tree paths, so
+    resolving an import is a handful of set and dict lookups and never touches
+    the filesystem. Only the few configuration files that affect resolution
+    (the root tsconfig.json/jsconfig.json and package.json files) are read.
+    Python imports are looked up in a map of dotted module names to files.
+    """
+
+    def __init__(self, paths: List[str], repo_path: Optional[str] = None):
+        self.paths = set(paths)
+        self.alias_patterns: List[Tuple[str, str, List[str]]] = []
+        self.base_url: Optional[str] = None
+        self.packages: Dict[str, str] = {}
+        self.package_entries: Dict[str, Optional[str]] = {}
+        self.java_files: Dict[str, List[str]] = defaultdict(list)
+        self.python_modules: Dict[str, str] = {}
+
+        python_files = []
+        for path in self.paths:
+            if path.endswith('.java'):
+                self.java_files[posixpath.basename(path)].append(path)
+            elif path.endswith('.py'):
+                python_files.append(path)
+
+        if python_files:
+            self._index_python_modules(python_files)
+
+        if repo_path:
+            self._load_js_config(repo_path)
+            self._load_packages(repo_path)
+
+    @staticmethod
+    def _read_json(repo_path: str, tree_path: str) -> Optional[Dict]:
+        """Read a JSON configuration file of the repository, or None if it cannot be parsed."""
+        try:
+            with open(os.path.join(repo_path, tree_path.lstrip('/')), 'r', encoding='utf-8', errors='ignore') as f:
+                data = load_jsonc(f.read())
+            return data if isinstance(data, dict) else None
+        except (OSError, ValueError) as e:
+            print(f"Error reading {tree_path}: {e}")
+            return None
+
+    def _load_js_config(self, repo_path: str) -> None:
+        """Index baseUrl and path aliases of the root tsconfig.json or jsconfig.json."""
+        for config_path in ('/tsconfig.json', '/jsconfig.json'):
+            if config_path not in self.paths:
+                continue
+            config = self._read_json(repo_path, config_path)
+            if config is None:
+                continue
+
+            options = config.get('compilerOptions') or {}
+            base_url = options.get('baseUrl')
+            if isinstance(base_url, str):
+                self.base_url = posixpath.normpath(posixpath.join('/', base_url))
+
+            # Alias targets are relative to baseUrl, or to the config file without one
+            alias_base = self.base_url or '/'
+            for pattern, targets in (options.get('paths') or {}).items():
+                if not isinstance(targets, list):
+                    continue
+                prefix, star, suffix = pattern.partition('*')
+                resolved_targets = [posixpath.join(alias_base, target) for target in targets if isinstance(target, str)]
+                self.alias_patterns.append((prefix, suffix if star else None, resolved_targets))
+
+            # Longest prefix first, like TypeScript
+            self.alias_patterns.sort(key=lambda alias: len(alias[0]), reverse=True)
+            return
+
+    def _load_packages(self, repo_path: str) -> None:
+        """Index the name and entry point of every package.json in the repository."""
+        for path in self.paths:
+            if posixpath.basename(path) != 'package.json':
+                continue
+            package = self._read_json(repo_path, path)
+            if package is None:
+                continue
+
+            package_dir = posixpath.dirname(path)
+            entry = self._package_entry(package)
+            self.package_entries[package_dir] = posixpath.normpath(posixpath.join(package_dir, entry)) if entry else None
+            if isinstance(package.get('name'), str):
+                self.packages[package['name']] = package_dir
+
+    @staticmethod
+    def _package_entry(package: Dict) -> Optional[str]:
+        """Get the entry point of a package from its "exports" or "main" field."""
+        exports = package.get('exports')
+        if isinstance(exports, dict) and '.' in exports:
+            exports = exports['.']
+        while isinstance(exports, dict):
+            exports = next((exports[condition] for condition in PACKAGE_EXPORT_CONDITIONS if condition in exports), None)
+        if isinstance(exports, str):
+            return exports
+
+        main = package.get('main')
+        return main if isinstance(main, str) else None
+
+    def _probe_js(self, base: str, visited: Optional[Set[str]] = None) -> Optional[str]:
+        """Find the file a resolved JavaScript/TypeScript path refers to."""
+        if base in self.paths:
+            return base
+
+        for extension in JS_RESOLVE_EXTENSIONS:
+            if base + extension in self.paths:
+                return base + extension
+
+        # TypeScript sources imported by their compiled name ('./util.js' -> './util.ts')
+        stem, extension = posixpath.splitext(base)
+        if extension in ('.js', '.jsx', '.mjs', '.cjs'):
+            for ts_extension in ('.ts', '.tsx', '.mts', '.cts'):
+                if stem + ts_extension in self.paths:
+                    return stem + ts_extension
+
+        # Directory imports resolve to the package entry point or an index file
+        # Package entries can point at each other, so each directory is followed once
+        entry = self.package_entries.get(base)
+        visited = visited or set()
+        if entry and entry != base and entry not in visited:
+            visited.add(base)
+            found = self._probe_js(entry, visited)
+            if found:
+                return found
+        for extension in JS_RESOLVE_EXTENSIONS:
+            if base + '/index' + extension in self.paths:
+                return base + '/index' + extension
+
+        return None
+
+    def resolve_js(self, specifier: str, file_path: str) -> Optional[str]:
+        """
+        Resolve a JavaScript/TypeScript import specifier to a file path.
+
+        Relative specifiers are resolved against the importing file, the rest
+        against tsconfig/jsconfig path aliases, baseUrl and the packages of the
+        repository. Imports of external packages resolve to None.
+        """
+        if specifier.startswith(('./', '../')) or specifier in ('.', '..'):
+            return self._probe_js(posixpath.normpath(posixpath.join(posixpath.dirname(file_path), specifier)))
+        if specifier.startswith('/'):
+            return self._probe_js(posixpath.normpath(specifier))
+
+        for prefix, suffix, targets in self.alias_patterns:
+            if suffix is None:
+                if specifier != prefix:
+                    continue
+                captured = ''
+            elif specifier.startswith(prefix) and specifier.endswith(suffix) and len(specifier) >= len(prefix) + len(suffix):
+                captured = specifier[len(prefix):len(specifier) - len(suffix)]
+            else:
+                continue
+            for target in targets:
+                found = self._probe_js(posixpath.normpath(target.replace('*', captured)))
+                if found:
+                    return found
+
+        if self.base_url:
+            found = self._probe_js(posixpath.normpath(posixpath.join(self.base_url, specifier)))
+            if found:
+                return found
+
+        # Workspace packages, imported by name ('@scope/pkg/sub')
+        parts = specifier.split('/')
+        name_length = 2 if specifier.startswith('@') else 1
+        package_dir = self.packages.get('/'.join(parts[:name_length]))
+        if package_dir is not None:
+            subpath = '/'.join(parts[name_length:])
+            return self._probe_js(posixpath.join(package_dir, subpath) if subpath else package_dir)
+
+        return None
+
+    def resolve_java(self, import_path: str) -> Optional[str]:
+        """Resolve a Java import ('com.example.Util', 'static com.example.Util.max') to a file path."""
+        parts = import_path.replace('static ', '', 1).strip().split('.')
+        if parts[-1] == '*':
+            return None
+        # Static imports name a member of the class; try the longest class path first
+        for length in range(len(parts), 0, -1):
+            relative = '/'.join(parts[:length]) + '.java'
+            for path in self.java_files.get(parts[length - 1] + '.java', ()):
+                if path == '/' + relative or path.endswith('/' + relative):
+                    return path
+        return None
+
+    def _index_python_modules(self, python_files: List[str]) -> None:
+        """
+        Map the dotted name of every Python module to its file.
+
+        Modules are named relative to each source root: the repository root,
+        '/src', and the parent directory of every top-level package (a package
+        whose parent has no __init__.py), so 'src/' layouts and packages nested
+        in project directories are found. Directories without __init__.py are
+        namespace packages, named like regular ones. When two files claim the
+        same name, the one under the deepest source root wins.
+        """
+        package_dirs = {posixpath.dirname(path) for path in python_files if path.endswith('/__init__.py')}
+        roots = {'/', '/src'}
+        for package_dir in package_dirs:
+            parent = posixpath.dirname(package_dir)
+            if parent not in package_dirs:
+                roots.add(parent)
+
+        candidates = {}
+        for path in python_files:
+            module_path = path[:-len('/__init__.py')] if path.endswith('/__init__.py') else path[:-len('.py')]
+            directory = posixpath.dirname(path)
+            while True:
+                if directory in roots and module_path != directory:
+                    name = module_path[len(directory):].strip('/').replace('/', '.')
+                    # Deepest root first, then by path, so the result does not depend on set order
+                    depth = directory.count('/') if directory != '/' else 0
+                    rank = (-depth, path)
+                    if name not in candidates or rank < candidates[name][0]:
+                        candidates[name] = (rank, path)
+                if directory == '/':
+                    break
+                directory = posixpath.dirname(directory)
+
+        self.python_modules = {name: path for name, (_, path) in candidates.items()}
+
+    def resolve_python(self, module: str, file_path: str, level: int = 0) -> Optional[str]:
+        """
+        Resolve a Python module name to a file path.
+
+        Absolute names ('pkg.util') are looked up in the module map; relative
+        ones (level > 0) start from the package of the importing file, one
+        package up per extra level, like the interpreter does.
+        """
+        if not level:
+            return self.python_modules.get(module)
+
+        base = posixpath.dirname(file_path)
+        for _ in range(level - 1):
+            if base == '/':
+                return None
+            base = posixpath.dirname(base)
+
+        module_path = posixpath.join(base, module.replace('.', '/')) if module else base.rstrip('/')
+        if module_path + '.py' in self.paths:
+            return module_path + '.py'
+        if module_path + '/__init__.py' in self.paths:
+            return module_path + '/__init__.py'
+        return None
+
+    def _resolve_python_import(self, imported: Dict, file_path: str) -> List[Dict]:
+        """
+        Resolve a Python import to one or more import entries.
+
+        'from pkg import mod' may import a submodule rather than a name defined
+        in the package, so symbols that name a module of the repository get an
+        import of their own, and the rest stay with the package.
+        """
+        module = imported['source']
+        level = imported.get('level', 0)
+        source = self.resolve_python(module, file_path, level) if module or level else None
+
+        symbols = []
+        submodules = []
+        # Only 'from' imports, which record a level, can name submodules
+        if 'level' in imported and (source is None or source.endswith('/__init__.py')):
+            for symbol in imported.get('symbols', []):
+                name = symbol.partition(' as ')[0].strip()
+                submodule = self.resolve_python(f"{module}.{name}" if module else name, file_path, level) if name != '*' else None
+                if submodule:
+                    submodules.append(dict(imported, source=submodule, type='file', symbols=[symbol]))
+                else:
+                    symbols.append(symbol)
+        else:
+            symbols = imported.get('symbols', [])
+
+        resolved = []
+        if source:
+            resolved.append(dict(imported, source=source, type='file', symbols=symbols))
+        elif symbols or not submodules:
+            resolved.append(dict(imported, symbols=symbols))
+        return resolved + submodules
+
+    def resolve_imports(self, file_node: Dict) -> Optional[List[Dict]]:
+        """
+        Get a copy of the imports of a file with those of repository files resolved.
+
+        Resolved imports get the file's tree path as 'source' and type 'file';
+        the others are copied unchanged. Returns None if the file has no imports.
+        """
+        imports = file_node.get('imports')
+        if not imports:
+            return None
+
+        path = file_node['path']
+        resolved_imports = []
+        for imported in imports:
+            source = None
+            if imported.get('type') == 'module' and path.endswith('.py'):
+                resolved_imports.extend(self._resolve_python_import(imported, path))
+                continue
+            if imported.get('type') == 'module' and path.endswith(JS_SOURCE_EXTENSIONS):
+                source = self.resolve_js(imported['source'], path)
+            elif imported.get('type') == 'package' and path.endswith('.java'):
+                source = self.resolve_java(imported['source'])
+
+            if source:
+                resolved_imports.append(dict(imported, source=source, type='file'))
+            else:
+                resolved_imports.append(dict(imported))
+        return resolved_imports
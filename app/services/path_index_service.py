@@ -0,0 +1,219 @@
+import os
+import base64
+import binascii
+import posixpath
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+
+from app.services.repository_service import RepositoryService, get_mongo
+from app.utils.path_filter import PathFilter
+from app.utils.repo_walker import normalize_subdirectory, walk_directories
+
+# Documents written per insert_many() call while building an index
+INSERT_BATCH_SIZE = 1000
+
+# Key of the index of a repository that has no commit SHA
+UNVERSIONED = 'unversioned'
+
+# Set once the collection indexes have been created by this process
+_indexes_created = False
+
+
+class PathIndexService:
+    """
+    Persisted index of the files and directories of a repository, for lazy structure loading.
+
+    Every file and directory is one document of the repository_paths
+    collection holding its parent path, its size (rolled up over all files
+    below a directory) and, for directories, the number of immediate children
+    and of files below it. Listing a directory is then an indexed range read
+    on (repo_id, commit_sha, parent, order), paginated with an opaque cursor,
+    instead of a walk of the disk. An index is built once per commit, after
+    cloning or on the first request; the path_indexes collection records
+    which commit the current index of each repository describes.
+    """
+
+    @staticmethod
+    def _ensure_indexes():
+        """Create the collection indexes the listings rely on, once per process."""
+        global _indexes_created
+        if _indexes_created:
+            return
+        db = get_mongo().db
+        db.repository_paths.create_index(
+            [('repo_id', ASCENDING), ('commit_sha', ASCENDING), ('parent', ASCENDING), ('order', ASCENDING)],
+            unique=True
+        )
+        _indexes_created = True
+
+    @staticmethod
+    def build_index(repo_id: str, repo_path: str) -> Optional[str]:
+        """
+        Walk a repository and store its path index, replacing older ones.
+
+        Returns:
+            Key of the new index (the commit SHA), or None if it could not be built
+        """
+        try:
+            PathIndexService._ensure_indexes()
+            commit_sha = RepositoryService.get_head_commit(repo_path) or UNVERSIONED
+            documents = PathIndexService._collect_documents(repo_id, commit_sha, repo_path)
+
+            paths = get_mongo().db.repository_paths
+            for start in range(0, len(documents), INSERT_BATCH_SIZE):
+                try:
+                    paths.insert_many(documents[start:start + INSERT_BATCH_SIZE], ordered=False)
+                except BulkWriteError as e:
+                    # A concurrent build of the same commit already stored these paths
+                    if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                        raise
+
+            get_mongo().db.path_indexes.update_one(
+                {'_id': repo_id},
+                {'$set': {
+                    'commit_sha': commit_sha,
+                    'node_count': len(documents),
+                    'built_at': datetime.utcnow()
+                }},
+                upsert=True
+            )
+            paths.delete_many({'repo_id': repo_id, 'commit_sha': {'$ne': commit_sha}})
+            return commit_sha
+        except Exception as e:
+            print(f"Error building path index for repository {repo_id}: {e}")
+            return None
+
+    @staticmethod
+    def _collect_documents(repo_id: str, commit_sha: str, repo_path: str) -> List[Dict]:
+        """Walk a repository and build one index document per file and directory."""
+        root = {
+            'repo_id': repo_id,
+            'commit_sha': commit_sha,
+            'parent': None,
+            'order': '',
+            'name': os.path.basename(repo_path),
+            'type': 'directory',
+            'path': '/',
+            'size': 0,
+            'child_count': 0,
+            'file_count': 0
+        }
+        documents = [root]
+        directories = {'.': root}
+        walk_order = ['.']
+
+        for rel_path, entries in walk_directories(repo_path, path_filter=PathFilter.for_repository(repo_path)):
+            parent = directories.get(rel_path)
+            if parent is None:
+                continue
+            parent['child_count'] = len(entries)
+
+            for entry in entries:
+                name = entry.path.rsplit('/', 1)[-1]
+                document = {
+                    'repo_id': repo_id,
+                    'commit_sha': commit_sha,
+                    'parent': parent['path'],
+                    # Directories sort before files, then by name
+                    'order': ('0' if entry.is_dir else '1') + name,
+                    'name': name,
+                    'type': 'directory' if entry.is_dir else 'file',
+                    'path': '/' + entry.path,
+                    'size': entry.size
+                }
+                if entry.is_dir:
+                    document['child_count'] = 0
+                    document['file_count'] = 0
+                    directories[entry.path] = document
+                    walk_order.append(entry.path)
+                else:
+                    extension = os.path.splitext(name)[1]
+                    document['extension'] = extension[1:] if extension else ''
+                    document['language'] = RepositoryService._get_language_from_extension(extension)
+                    parent['size'] += entry.size
+                    parent['file_count'] += 1
+                documents.append(document)
+
+        # Directories are walked top-down, so in reverse every directory comes before its parent
+        for rel_path in reversed(walk_order[1:]):
+            directory = directories[rel_path]
+            parent = directories[rel_path.rsplit('/', 1)[0] if '/' in rel_path else '.']
+            parent['size'] += directory['size']
+            parent['file_count'] += directory['file_count']
+
+        return documents
+
+    @staticmethod
+    def get_children(repo_id: str, repo_path: str, path: str = '/', limit: int = 100,
+                     cursor: Optional[str] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        List one page of the immediate children of a directory.
+
+        The index is built first if the repository has none for its HEAD commit.
+
+        Args:
+            repo_id: Repository ID
+            repo_path: Path of the cloned repository
+            path: Tree path of the directory ('/src/components')
+            limit: Maximum number of children to return
+            cursor: next_cursor of the previous page
+
+        Returns:
+            Tuple of the page ({'directory', 'children', 'next_cursor'}) and an
+            error message
+        """
+        after = ''
+        if cursor:
+            try:
+                after = base64.b64decode(cursor.encode('ascii'), altchars=b'-_', validate=True).decode('utf-8')
+            except (binascii.Error, UnicodeError, ValueError):
+                return None, 'Invalid cursor'
+
+        commit_sha = RepositoryService.get_head_commit(repo_path) or UNVERSIONED
+        index = get_mongo().db.path_indexes.find_one({'_id': repo_id})
+        if not index or index.get('commit_sha') != commit_sha:
+            commit_sha = PathIndexService.build_index(repo_id, repo_path)
+            if commit_sha is None:
+                return None, 'Path index could not be built'
+
+        # Look the directory up by its (parent, order) key so the read is indexed too
+        start = normalize_subdirectory(path)
+        path = '/' if start == '.' else '/' + start
+        parent, order = (None, '') if path == '/' else (posixpath.dirname(path), '0' + posixpath.basename(path))
+
+        paths = get_mongo().db.repository_paths
+        projection = {'_id': 0, 'repo_id': 0, 'commit_sha': 0, 'order': 0}
+        directory = paths.find_one({'repo_id': repo_id, 'commit_sha': commit_sha, 'parent': parent, 'order': order}, projection)
+        if not directory:
+            return None, 'Directory not found'
+
+        # One extra document tells whether another page follows
+        documents = list(paths.find(
+            {'repo_id': repo_id, 'commit_sha': commit_sha, 'parent': path, 'order': {'$gt': after}},
+            dict(projection, order=1)
+        ).sort('order', ASCENDING).limit(limit + 1))
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = base64.urlsafe_b64encode(documents[-1]['order'].encode('utf-8')).decode('ascii')
+        for document in documents:
+            del document['order']
+
+        return {
+            'directory': directory,
+            'children': documents,
+            'next_cursor': next_cursor
+        }, None
+
+    @staticmethod
+    def delete_index(repo_id: str):
+        """Delete the path index of a repository."""
+        try:
+            get_mongo().db.repository_paths.delete_many({'repo_id': repo_id})
+            get_mongo().db.path_indexes.delete_one({'_id': repo_id})
+        except Exception as e:
+            print(f"Error deleting path index for repository {repo_id}: {e}")
@@ -0,0 +1,165 @@
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from app.services.import_resolver import ImportResolver
+
+
+class ReferenceResolver:
+    """
+    Resolves the imports and calls of an analyzed file tree against the whole repository.
+
+    Imports are resolved to repository files first (see ImportResolver).
+    Extractors see one file at a time and record calls by bare name. Once every
+    file is analyzed, a symbol table of the names each file defines is built in
+    one pass over the tree, and each call is resolved with dict and set lookups:
+    first to the calling file itself, then to a symbol imported by name, then to
+    the first file the caller imports that defines the name at the top level.
+    Resolved call targets read '<file path>#<name>'; unresolved ones keep the
+    bare name.
+
+    Extraction results are shared with the analysis manifest, so resolved
+    entries are copies and the extracted ones are never modified.
+    """
+
+    @staticmethod
+    def resolve(file_tree: Dict, repo_path: Optional[str] = None) -> Dict:
+        """
+        Resolve the imports and calls of every file in an analyzed tree, in place.
+
+        Args:
+            file_tree: Tree built by the analyzer
+            repo_path: Path of the cloned repository, for reading the
+                configuration files that affect import resolution
+
+        Returns:
+            The same tree
+        """
+        files = list(ReferenceResolver._iter_files(file_tree))
+        import_resolver = ImportResolver([file_node['path'] for file_node in files], repo_path)
+        for file_node in files:
+            imports = import_resolver.resolve_imports(file_node)
+            if imports is not None:
+                file_node['imports'] = imports
+
+        local_symbols, top_level_symbols = ReferenceResolver._build_symbol_table(files)
+
+        for file_node in files:
+            if 'functions' not in file_node and 'classes' not in file_node:
+                continue
+
+            path = file_node['path']
+            imported_files, imported_names = ReferenceResolver._collect_imports(file_node)
+            resolved = {}
+
+            def resolve_call(name: str) -> str:
+                if name not in resolved:
+                    target = ReferenceResolver._resolve_name(name, path, local_symbols, top_level_symbols, imported_files, imported_names)
+                    resolved[name] = f"{target[0]}#{target[1]}" if target else name
+                return resolved[name]
+
+            if 'functions' in file_node:
+                file_node['functions'] = [ReferenceResolver._resolve_entry(function, resolve_call) for function in file_node['functions']]
+            if 'classes' in file_node:
+                file_node['classes'] = [
+                    dict(class_entry, methods=[ReferenceResolver._resolve_entry(method, resolve_call) for method in class_entry.get('methods', [])])
+                    for class_entry in file_node['classes']
+                ]
+
+        return file_tree
+
+    @staticmethod
+    def _iter_files(file_tree: Dict) -> Iterator[Dict]:
+        """Yield the file nodes of a tree."""
+        stack = [file_tree]
+        while stack:
+            directory = stack.pop()
+            for child in directory.get('children', []):
+                if child['type'] == 'file':
+                    yield child
+                else:
+                    stack.append(child)
+
+    @staticmethod
+    def _build_symbol_table(files: List[Dict]) -> Tuple[Dict[str, Set[str]], Dict[str, Set[str]]]:
+        """
+        Index the symbols defined in each file.
+
+        Returns:
+            Tuple of maps from file paths to the names they define: all functions,
+            classes and methods, and only the functions and classes other files
+            can import
+        """
+        local_symbols = {}
+        top_level_symbols = {}
+
+        for file_node in files:
+            names = set()
+            for function in file_node.get('functions', []):
+                names.add(function['name'])
+            for class_entry in file_node.get('classes', []):
+                names.add(class_entry['name'])
+            top_level_symbols[file_node['path']] = names
+
+            local_names = set(names)
+            for class_entry in file_node.get('classes', []):
+                for method in class_entry.get('methods', []):
+                    local_names.add(method['name'])
+            local_symbols[file_node['path']] = local_names
+
+        return local_symbols, top_level_symbols
+
+    @staticmethod
+    def _collect_imports(file_node: Dict) -> Tuple[Dict[str, None], Dict[str, Tuple[str, str]]]:
+        """
+        Collect the files a file imports and the names it imports from them.
+
+        Only imports resolved to files in the repository count.
+
+        Returns:
+            Tuple of the imported file paths, in import order, and a map from
+            local names to their (source file, name in the source file)
+        """
+        imported_files = {}
+        imported_names = {}
+
+        for imported in file_node.get('imports', []):
+            if imported.get('type') != 'file':
+                continue
+            source = imported['source']
+            imported_files[source] = None
+            for symbol in imported.get('symbols', []):
+                # 'name as alias' binds the alias locally
+                original, _, alias = symbol.partition(' as ')
+                original = original.strip()
+                imported_names[(alias or original).strip()] = (source, original)
+
+        return imported_files, imported_names
+
+    @staticmethod
+    def _resolve_name(name: str, path: str, local_symbols: Dict[str, Set[str]], top_level_symbols: Dict[str, Set[str]],
+                      imported_files: Dict[str, None], imported_names: Dict[str, Tuple[str, str]]) -> Optional[Tuple[str, str]]:
+        """Get the (defining file, name in that file) of a name called from the file at path, or None."""
+        if name in local_symbols.get(path, ()):
+            return path, name
+
+        if name in imported_names:
+            source, original = imported_names[name]
+            if original in top_level_symbols.get(source, ()):
+                return source, original
+
+        for source in imported_files:
+            if name in top_level_symbols.get(source, ()):
+                return source, name
+
+        return None
+
+    @staticmethod
+    def _resolve_entry(entry: Dict, resolve_call) -> Dict:
+        """Copy a function or method entry with its call targets resolved."""
+        dependencies = entry.get('dependencies')
+        if not dependencies:
+            return dict(entry)
+
+        return dict(entry, dependencies=[
+            dict(dependency, target=resolve_call(dependency['target'])) if dependency.get('type') == 'call' else dict(dependency)
+            for dependency in dependencies
+        ])
@@ -1,19 +1,53 @@
 import os
 import shutil
 import subprocess
-import json
+import hashlib
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-import ast  # For Python code analysis
-import re
 from collections import defaultdict
 
 from flask import current_app
 from app import mongo
+from app.services.analysis_cache_service import AnalysisCacheService
+from app.services.reference_resolver import ReferenceResolver
+from app.utils.config_utils import get_config
+from app.utils.etag import make_etag
+from app.utils.language_extractors import LanguageExtractor, get_extractor
+from app.utils.parse_budget import ParseBudget
+from app.utils.path_filter import BINARY_SNIFF_BYTES, PathFilter, is_binary, is_generated_content, is_generated_name
+from app.utils.repo_walker import WalkEntry, entry_depth, walk_directories, walk_repository
 from bson import ObjectId
 import threading
 import sys
 
+# Display names of common languages by file extension
+LANGUAGE_NAMES = {
+    'py': 'Python',
+    'js': 'JavaScript',
+    'jsx': 'JavaScript (React)',
+    'ts': 'TypeScript',
+    'tsx': 'TypeScript (React)',
+    'java': 'Java',
+    'c': 'C',
+    'cpp': 'C++',
+    'cs': 'C#',
+    'go': 'Go',
+    'rb': 'Ruby',
+    'php': 'PHP',
+    'html': 'HTML',
+    'css': 'CSS',
+    'scss': 'SCSS',
+    'json': 'JSON',
+    'md': 'Markdown',
+    'sql': 'SQL',
+    'swift': 'Swift',
+    'kt': 'Kotlin',
+    'rs': 'Rust',
+    'sh': 'Shell',
+    'bat': 'Batch',
+    'ps1': 'PowerShell'
+}
+
 # Get MongoDB connection safely
 def get_mongo():
     if hasattr(current_app, 'config') and 'get_mongo_connection' in current_app.config:
@@ -80,6 +114,16 @@ class RepositoryService:
             print(f"Error getting repository: {e}")
             return None
 
+    @staticmethod
+    def get_etag(repository: Dict) -> str:
+        """
+        Get the ETag of a repository document.
+
+        updated_at only has second resolution, so the version counter bumped
+        by every update tells apart changes within the same second.
+        """
+        return make_etag(repository['_id'], repository.get('version', 0), repository.get('updated_at'))
+
     @staticmethod
     def add_repository(repo_url: str) -> Dict:
         """Add a new repository to the database."""
@@ -102,7 +146,8 @@ class RepositoryService:
             'directory_count': 0,
             'total_size': 0,
             'languages': {},
-            'size_limit_mb': 500
+            'size_limit_mb': 500,
+            'version': 0
         }
         
         # Insert into database
@@ -134,6 +179,10 @@ class RepositoryService:
             # Get repository stats
             stats = RepositoryService._get_repository_stats(repo_path)
             
+            # Index the paths for lazy structure loading; imported here to avoid a circular import
+            from app.services.path_index_service import PathIndexService
+            PathIndexService.build_index(str(repo_id), repo_path)
+            
             # Update repository status and stats
             get_mongo().db.repositories.update_one(
                 {'_id': repo_id},
@@ -144,7 +193,7 @@ class RepositoryService:
                     'total_size': stats['total_size'],
                     'languages': stats['languages'],
                     'updated_at': datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')
-                }}
+                }, '$inc': {'version': 1}}
             )
         except Exception as e:
             # Update repository status to failed
@@ -154,7 +203,7 @@ class RepositoryService:
                     'status': 'failed',
                     'error': str(e),
                     'updated_at': datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')
-                }}
+                }, '$inc': {'version': 1}}
             )
 
     @staticmethod
@@ -165,23 +214,18 @@ class RepositoryService:
         total_size = 0
         languages = defaultdict(int)
         
-        for root, dirs, files in os.walk(repo_path):
-            # Skip .git directory
-            if '.git' in dirs:
-                dirs.remove('.git')
-                
-            directory_count += len(dirs)
+        for entry in walk_repository(repo_path, path_filter=PathFilter.for_repository(repo_path)):
+            if entry.is_dir:
+                directory_count += 1
+                continue
             
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_size = os.path.getsize(file_path)
-                total_size += file_size
-                file_count += 1
-                
-                # Get file extension for language stats
-                _, ext = os.path.splitext(file)
-                if ext:
-                    languages[ext] = 1
+            total_size += entry.size
+            file_count += 1
+            
+            # Get file extension for language stats
+            _, ext = os.path.splitext(entry.path)
+            if ext:
+                languages[ext] = 1
         
         return {
             'file_count': file_count,
@@ -190,6 +234,46 @@ class RepositoryService:
             'languages': dict(languages)
         }
 
+    @staticmethod
+    def get_head_commit(repo_path: str) -> Optional[str]:
+        """
+        Get the HEAD commit SHA of a cloned repository.
+
+        Reads the ref files under .git directly so the common case costs a couple
+        of small file reads instead of a git subprocess.
+        """
+        git_dir = os.path.join(repo_path, '.git')
+        try:
+            with open(os.path.join(git_dir, 'HEAD'), 'r') as f:
+                head = f.read().strip()
+
+            if not head.startswith('ref:'):
+                return head or None
+
+            ref = head[4:].strip()
+            ref_path = os.path.join(git_dir, *ref.split('/'))
+            if os.path.exists(ref_path):
+                with open(ref_path, 'r') as f:
+                    return f.read().strip() or None
+
+            # Refs of fresh clones are usually only in packed-refs
+            packed_refs_path = os.path.join(git_dir, 'packed-refs')
+            if os.path.exists(packed_refs_path):
+                with open(packed_refs_path, 'r') as f:
+                    for line in f:
+                        parts = line.strip().split(' ')
+                        if len(parts) == 2 and parts[1] == ref:
+                            return parts[0]
+        except (OSError, UnicodeDecodeError):
+            pass
+
+        try:
+            result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo_path,
+                                    check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            return result.stdout.decode().strip() or None
+        except Exception:
+            return None
+
     @staticmethod
     def delete_repository(repo_id: str) -> bool:
         """Delete a repository."""
@@ -206,7 +290,12 @@ class RepositoryService:
             repo_path = repo.get('repo_path')
             if repo_path and os.path.exists(repo_path):
                 shutil.rmtree(repo_path, ignore_errors=True)
-            
+
+            # Drop cached analysis results and the path index
+            AnalysisCacheService.invalidate(repo_id)
+            from app.services.path_index_service import PathIndexService
+            PathIndexService.delete_index(repo_id)
+
             # Delete from database
             get_mongo().db.repositories.delete_one({'_id': ObjectId(repo_id)})
             
@@ -239,36 +328,8 @@ class RepositoryService:
                         if not lang_name:
                             continue
                             
-                        # Map common extensions to language names
-                        lang_mapping = {
-                            'py': 'Python',
-                            'js': 'JavaScript',
-                            'jsx': 'JavaScript (React)',
-                            'ts': 'TypeScript',
-                            'tsx': 'TypeScript (React)',
-                            'java': 'Java',
-                            'c': 'C',
-                            'cpp': 'C++',
-                            'cs': 'C#',
-                            'go': 'Go',
-                            'rb': 'Ruby',
-                            'php': 'PHP',
-                            'html': 'HTML',
-                            'css': 'CSS',
-                            'scss': 'SCSS',
-                            'json': 'JSON',
-                            'md': 'Markdown',
-                            'sql': 'SQL',
-                            'swift': 'Swift',
-                            'kt': 'Kotlin',
-                            'rs': 'Rust',
-                            'sh': 'Shell',
-                            'bat': 'Batch',
-                            'ps1': 'PowerShell'
-                        }
-                        
                         # Use mapped name or original if not in mapping
-                        display_name = lang_mapping.get(lang_name, lang_name.upper())
+                        display_name = LANGUAGE_NAMES.get(lang_name, lang_name.upper())
                         
                         # Increment language count
                         all_languages[display_name] = all_languages.get(display_name, 0) + 1
@@ -312,359 +373,191 @@ class RepositoryService:
             'children': []
         }
         
+        dir_index = {'/': file_tree}
+        max_file_bytes = int(get_config('ANALYSIS_MAX_FILE_BYTES', 1024 * 1024))
+        budget_seconds = float(get_config('ANALYSIS_FILE_BUDGET_SECONDS', 5.0))
+        
         # Process all files and directories
-        for root, dirs, files in os.walk(repo_path):
-            # Skip .git directory
-            if '.git' in dirs:
-                dirs.remove('.git')
-            
-            # Get relative path from repo root
-            rel_path = os.path.relpath(root, repo_path)
-            if rel_path == '.':
-                current_dir = file_tree
-            else:
-                # Create or get the current directory node
-                current_dir = RepositoryService._get_or_create_dir_node(file_tree, rel_path)
+        for rel_path, entries in walk_directories(repo_path, path_filter=PathFilter.for_repository(repo_path)):
+            # Create or get the current directory node
+            current_dir = RepositoryService._get_or_create_dir_node(file_tree, rel_path, dir_index)
             
-            # Process directories
-            for dir_name in dirs:
-                dir_path = os.path.join(rel_path, dir_name)
-                if dir_path == '.':
-                    continue
+            for entry in entries:
+                name = entry.path.rsplit('/', 1)[-1]
                 
-                dir_node = {
-                    'name': dir_name,
-                    'type': 'directory',
-                    'path': '/' + dir_path.replace('\\', '/'),
-                    'children': []
-                }
-                current_dir['children'].append(dir_node)
-            
-            # Process files
-            for file_name in files:
-                file_path = os.path.join(root, file_name)
-                rel_file_path = os.path.relpath(file_path, repo_path)
-                abs_file_path = os.path.join(repo_path, rel_file_path)
-                
-                # Create file node
-                file_node = {
-                    'name': file_name,
-                    'type': 'file',
-                    'path': '/' + rel_file_path.replace('\\', '/'),
-                    'extension': os.path.splitext(file_name)[1][1:] if os.path.splitext(file_name)[1] else '',
-                    'size': os.path.getsize(abs_file_path)
-                }
-                
-                # Extract functions and classes if it's a supported file type
-                if file_name.endswith(('.js', '.jsx', '.ts', '.tsx', '.py', '.java')):
-                    functions, classes = RepositoryService._extract_functions_and_classes(abs_file_path, file_node['path'])
-                    if functions:
-                        file_node['functions'] = functions
-                    if classes:
-                        file_node['classes'] = classes
+                if entry.is_dir:
+                    dir_node = {
+                        'name': name,
+                        'type': 'directory',
+                        'path': '/' + entry.path,
+                        'children': []
+                    }
+                    current_dir['children'].append(dir_node)
+                    dir_index[dir_node['path']] = dir_node
+                    continue
                 
-                # Extract imports
-                imports = RepositoryService._extract_imports(abs_file_path, file_node['path'], repo_path)
-                if imports:
-                    file_node['imports'] = imports
+                file_node, extractor = RepositoryService._build_file_node(entry, max_file_bytes)
+                if extractor is not None:
+                    abs_file_path = os.path.join(repo_path, entry.path)
+                    file_node.update(RepositoryService._analyze_file(abs_file_path, file_node['path'], extractor, budget_seconds=budget_seconds)[1])
                 
                 current_dir['children'].append(file_node)
         
+        # Imports and calls can only be resolved across files once every file is analyzed
+        ReferenceResolver.resolve(file_tree, repo_path)
+        
         return file_tree
 
     @staticmethod
-    def _get_or_create_dir_node(root, path):
-        """Get or create a directory node in the tree."""
+    def _build_file_tree(repo_path, children, start='.', max_depth=None):
+        """
+        Build the file and directory nodes of a repository, or of the directory start within it, into children.
+
+        Uses the same walker and path filter as the analyzer, so dependency and
+        build directories and .gitignore'd paths are left out of the structure.
+        With max_depth, only that many levels are walked and the directories at
+        the limit get 'expanded': False.
+        """
+        dir_children = {start: children}
+        
+        for rel_path, entries in walk_directories(repo_path, path_filter=PathFilter.for_repository(repo_path), start=start, max_depth=max_depth):
+            current_children = dir_children.get(rel_path)
+            if current_children is None:
+                continue
+            
+            for entry in entries:
+                name = entry.path.rsplit('/', 1)[-1]
+                if entry.is_dir:
+                    node = {
+                        'name': name,
+                        'type': 'directory',
+                        'path': '/' + entry.path,
+                        'children': []
+                    }
+                    if max_depth is not None and entry_depth(entry.path, start) >= max_depth:
+                        node['expanded'] = False
+                    dir_children[entry.path] = node['children']
+                else:
+                    node = {
+                        'name': name,
+                        'type': 'file',
+                        'path': '/' + entry.path,
+                        'size': entry.size,
+                        'language': RepositoryService._get_language_from_extension(os.path.splitext(name)[1])
+                    }
+                current_children.append(node)
+
+    @staticmethod
+    def _get_language_from_extension(ext):
+        """Get the display name of the language of a file extension, or None if unknown."""
+        return LANGUAGE_NAMES.get(ext.lstrip('.').lower())
+
+    @staticmethod
+    def _get_or_create_dir_node(root, path, index):
+        """
+        Get or create a directory node in the tree.
+
+        index maps tree paths ('/src/components') to their directory nodes so each
+        lookup is a dict access rather than a scan of every level's children.
+        New nodes, including missing ancestors, are added to the index.
+        """
         if path == '.' or path == '':
             return root
         
-        parts = path.split(os.sep)
-        current = root
+        tree_path = '/' + path.replace(os.sep, '/')
+        node = index.get(tree_path)
+        if node is not None:
+            return node
         
-        for part in parts:
-            found = False
-            for child in current['children']:
-                if child['name'] == part and child['type'] == 'directory':
-                    current = child
-                    found = True
-                    break
-            
-            if not found:
-                new_dir = {
+        current = root
+        current_path = ''
+        for part in path.split(os.sep):
+            current_path += '/' + part
+            node = index.get(current_path)
+            if node is None:
+                node = {
                     'name': part,
                     'type': 'directory',
-                    'path': '/' + os.path.join(*parts[:parts.index(part) + 1]).replace('\\', '/'),
+                    'path': current_path,
                     'children': []
                 }
-                current['children'].append(new_dir)
-                current = new_dir
+                current['children'].append(node)
+                index[current_path] = node
+            current = node
         
         return current
-    
+
     @staticmethod
-    def _extract_functions_and_classes(file_path, file_rel_path):
-        """Extract functions and classes from a file."""
-        functions = []
-        classes = []
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # JavaScript/TypeScript
-            if file_path.endswith(('.js', '.jsx', '.ts', '.tsx')):
-                # Extract functions
-                function_patterns = [
-                    r'(?:export\s+)?(?:async\s+)?function\s+(\w+)',  # function declarations
-                    r'(?:export\s+)?const\s+(\w+)\s*=\s*(?:async\s+)?function',  # function expressions
-                    r'(?:export\s+)?const\s+(\w+)\s*=\s*(?:async\s+)?\(',  # arrow functions
-                ]
-                
-                for pattern in function_patterns:
-                    for match in re.finditer(pattern, content):
-                        func_name = match.group(1)
-                        # Find function dependencies
-                        func_content = RepositoryService._get_function_content(content, match.end())
-                        dependencies = RepositoryService._extract_function_dependencies(func_content, file_rel_path)
-                        
-                        functions.append({
-                            'name': func_name,
-                            'type': 'function',
-                            'dependencies': dependencies
-                        })
-                
-                # Extract classes
-                class_pattern = r'(?:export\s+)?class\s+(\w+)'
-                for match in re.finditer(class_pattern, content):
-                    class_name = match.group(1)
-                    class_content = RepositoryService._get_class_content(content, match.end())
-                    
-                    # Extract methods
-                    method_pattern = r'(?:async\s+)?(\w+)\s*\([^)]*\)\s*{'
-                    methods = []
-                    
-                    for method_match in re.finditer(method_pattern, class_content):
-                        method_name = method_match.group(1)
-                        if method_name not in ['constructor', 'get', 'set']:
-                            method_content = RepositoryService._get_function_content(class_content, method_match.end())
-                            dependencies = RepositoryService._extract_function_dependencies(method_content, file_rel_path)
-                            
-                            methods.append({
-                                'name': method_name,
-                                'type': 'method',
-                                'dependencies': dependencies
-                            })
-                    
-                    classes.append({
-                        'name': class_name,
-                        'type': 'class',
-                        'methods': methods
-                    })
-            
-            # Python
-            elif file_path.endswith('.py'):
-                try:
-                    tree = ast.parse(content)
-                    
-                    for node in ast.walk(tree):
-                        # Extract functions
-                        if isinstance(node, ast.FunctionDef):
-                            dependencies = []
-                            for child in ast.walk(node):
-                                if isinstance(child, ast.Call) and isinstance(child.func, ast.Name):
-                                    dependencies.append({
-                                        'target': child.func.id,
-                                        'type': 'call',
-                                        'line': child.lineno
-                                    })
-                            
-                            functions.append({
-                                'name': node.name,
-                                'type': 'function',
-                                'dependencies': dependencies
-                            })
-                        
-                        # Extract classes
-                        elif isinstance(node, ast.ClassDef):
-                            methods = []
-                            for child in node.body:
-                                if isinstance(child, ast.FunctionDef):
-                                    method_deps = []
-                                    for method_child in ast.walk(child):
-                                        if isinstance(method_child, ast.Call) and isinstance(method_child.func, ast.Name):
-                                            method_deps.append({
-                                                'target': method_child.func.id,
-                                                'type': 'call',
-                                                'line': method_child.lineno
-                                            })
-                                    
-                                    methods.append({
-                                        'name': child.name,
-                                        'type': 'method',
-                                        'dependencies': method_deps
-                                    })
-                            
-                            classes.append({
-                                'name': node.name,
-                                'type': 'class',
-                                'methods': methods
-                            })
-                except SyntaxError:
-                    pass
-            
-            # Java
-            elif file_path.endswith('.java'):
-                # Extract classes
-                class_pattern = r'(?:public|private|protected)?\s*class\s+(\w+)'
-                for match in re.finditer(class_pattern, content):
-                    class_name = match.group(1)
-                    class_content = RepositoryService._get_class_content(content, match.end())
-                    
-                    # Extract methods
-                    method_pattern = r'(?:public|private|protected)?\s+(?:static\s+)?[\w<>[\]]+\s+(\w+)\s*\([^)]*\)\s*{'
-                    methods = []
-                    
-                    for method_match in re.finditer(method_pattern, class_content):
-                        method_name = method_match.group(1)
-                        method_content = RepositoryService._get_function_content(class_content, method_match.end())
-                        dependencies = RepositoryService._extract_function_dependencies(method_content, file_rel_path)
-                        
-                        methods.append({
-                            'name': method_name,
-                            'type': 'method',
-                            'dependencies': dependencies
-                        })
-                    
-                    classes.append({
-                        'name': class_name,
-                        'type': 'class',
-                        'methods': methods
-                    })
-        
-        except Exception as e:
-            print(f"Error extracting functions and classes from {file_path}: {e}")
+    def _build_file_node(entry: WalkEntry, max_file_bytes: int) -> Tuple[Dict, Optional[LanguageExtractor]]:
+        """
+        Create the node of a walked file.
+
+        Returns:
+            Tuple of the node and the extractor to analyze the file with, or None
+            if its language is not analyzed or it is skipped without being read
+        """
+        name = entry.path.rsplit('/', 1)[-1]
+        extension = os.path.splitext(name)[1]
+        file_node = {
+            'name': name,
+            'type': 'file',
+            'path': '/' + entry.path,
+            'extension': extension[1:] if extension else '',
+            'size': entry.size
+        }
         
-        return functions, classes
+        extractor = get_extractor(extension)
+        if extractor is None:
+            return file_node, None
+        if entry.size > max_file_bytes:
+            # Kept in the tree but never read
+            file_node['skipped'] = 'too_large'
+            return file_node, None
+        if is_generated_name(name):
+            # Minified or bundled output is kept in the tree but not parsed
+            file_node['skipped'] = 'generated'
+            return file_node, None
+        return file_node, extractor
 
     @staticmethod
-    def _extract_imports(file_path, file_rel_path, repo_path):
-        """Extract imports from a file."""
-        imports = []
-        
+    def _analyze_file(file_path: str, file_rel_path: str, extractor: LanguageExtractor, known_hash: Optional[str] = None,
+                      budget_seconds: Optional[float] = None) -> Tuple[Optional[str], Optional[Dict]]:
+        """
+        Analyze a single source file.
+
+        The file is read and decoded once and handed to the extractor, which
+        returns only non-empty results. Extraction that runs past
+        budget_seconds of CPU time is abandoned and marked 'truncated'.
+
+        Returns:
+            Tuple of the content hash and the extraction result. The result is None
+            when the content hash equals known_hash, so the caller can reuse the
+            result it already has.
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # JavaScript/TypeScript imports
-            if file_path.endswith(('.js', '.jsx', '.ts', '.tsx')):
-                import_patterns = [
-                    (r'import\s+{([^}]+)}\s+from\s+[\'"]([^\'"]+)[\'"]', True),  # Named imports
-                    (r'import\s+(\w+)\s+from\s+[\'"]([^\'"]+)[\'"]', False),  # Default imports
-                    (r'import\s+\*\s+as\s+(\w+)\s+from\s+[\'"]([^\'"]+)[\'"]', False),  # Namespace imports
-                ]
-                
-                for pattern, is_named in import_patterns:
-                    for match in re.finditer(pattern, content):
-                        if is_named:
-                            symbols = [s.strip() for s in match.group(1).split(',')]
-                            module = match.group(2)
-                        else:
-                            symbols = [match.group(1)]
-                            module = match.group(2)
-                        
-                        resolved_path = RepositoryService._resolve_js_dependency(module, file_path, repo_path)
-                        if resolved_path:
-                            imports.append({
-                                'source': '/' + resolved_path.replace('\\', '/'),
-                                'type': 'file',
-                                'symbols': symbols
-                            })
-            
-            # Python imports
-            elif file_path.endswith('.py'):
-                try:
-                    tree = ast.parse(content)
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.Import):
-                            for name in node.names:
-                                imports.append({
-                                    'source': name.name,
-                                    'type': 'module',
-                                    'symbols': [name.asname or name.name]
-                                })
-                        elif isinstance(node, ast.ImportFrom):
-                            module = node.module or ''
-                            imports.append({
-                                'source': module,
-                                'type': 'module',
-                                'symbols': [n.name for n in node.names]
-                            })
-                except SyntaxError:
-                    pass
-            
-            # Java imports
-            elif file_path.endswith('.java'):
-                import_pattern = r'import\s+([^;]+);'
-                for match in re.finditer(import_pattern, content):
-                    import_path = match.group(1)
-                    imports.append({
-                        'source': import_path,
-                        'type': 'package',
-                        'symbols': [import_path.split('.')[-1]]
-                    })
-                
+            with open(file_path, 'rb') as f:
+                # Sniff a small prefix so binary files are never read in full
+                raw = f.read(BINARY_SNIFF_BYTES)
+                if is_binary(raw):
+                    return None, {'skipped': 'binary'}
+                raw += f.read()
         except Exception as e:
-            print(f"Error extracting imports from {file_path}: {e}")
+            print(f"Error reading {file_path}: {e}")
+            return None, {}
         
-        return imports
-
-    @staticmethod
-    def _get_function_content(content, start_pos):
-        """Get the content of a function."""
-        brace_count = 0
-        in_string = False
-        string_char = None
+        content_hash = hashlib.sha1(raw).hexdigest()
+        if known_hash is not None and content_hash == known_hash:
+            return content_hash, None
         
-        for i, char in enumerate(content[start_pos:], start_pos):
-            if char in ['"', "'"]:
-                if not in_string:
-                    in_string = True
-                    string_char = char
-                elif string_char == char:
-                    in_string = False
-            elif not in_string:
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        return content[start_pos:i + 1]
-        
-        return content[start_pos:]
-
-    @staticmethod
-    def _get_class_content(content, start_pos):
-        """Get the content of a class."""
-        return RepositoryService._get_function_content(content, start_pos)
-
-    @staticmethod
-    def _extract_function_dependencies(content, file_path):
-        """Extract function dependencies from function content."""
-        dependencies = []
+        content = raw.decode('utf-8', errors='ignore')
+        if '\r' in content:
+            # Match the newline handling of text mode reads
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
         
-        # Extract function calls
-        call_pattern = r'(\w+)\s*\('
-        for match in re.finditer(call_pattern, content):
-            func_name = match.group(1)
-            # Skip common built-in functions and keywords
-            if func_name not in ['if', 'for', 'while', 'switch', 'catch']:
-                dependencies.append({
-                    'target': f"{file_path}#{func_name}",
-                    'type': 'call',
-                    'line': content[:match.start()].count('\n') + 1
-                })
+        if is_generated_content(content):
+            return content_hash, {'skipped': 'generated'}
         
-        return dependencies
+        return content_hash, extractor.extract(content, file_rel_path, ParseBudget(budget_seconds))
 
     @staticmethod
     def get_repositories(page=1, limit=10, sort_by='created_at', sort_dir='desc'):
@@ -695,56 +588,3 @@ class RepositoryService:
         except Exception as e:
             print(f"Error getting repositories: {e}")
             return {'repositories': [], 'pagination': {'page': page, 'limit': limit, 'total': 0, 'pages': 0}} 
-
-    @staticmethod
-    def _register_exported_function(file_path, func_name):
-        """Register an exported function for cross-file call detection."""
-        if func_name not in RepositoryService._exported_functions:
-            RepositoryService._exported_functions[func_name] = []
-        RepositoryService._exported_functions[func_name].append(file_path)
-
-    @staticmethod
-    def _find_function_definition(func_name):
-        """Find the file that defines a function."""
-        if func_name in RepositoryService._exported_functions:
-            # Return the first file that defines this function
-            # In a more sophisticated implementation, we could use import analysis
-            # to determine which specific file is being referenced
-            return RepositoryService._exported_functions[func_name][0]
-        return None
-
-    @staticmethod
-    def _resolve_python_dependency(module, file_path, base_path):
-        """Resolve a Python import to a file path."""
-        # Convert dot notation to directory structure
-        module_path = module.replace('.', '/')
-        
-        # Check for .py file
-        py_path = f"{module_path}.py"
-        full_path = os.path.join(base_path, py_path)
-        if os.path.exists(full_path):
-            return py_path
-        
-        # Check for package (directory with __init__.py)
-        init_path = f"{module_path}/__init__.py"
-        full_init_path = os.path.join(base_path, init_path)
-        if os.path.exists(full_init_path):
-            return init_path
-        
-        return None
-
-    @staticmethod
-    def _resolve_java_dependency(module, file_path, base_path):
-        """Resolve a Java import to a file path."""
-        # Convert package notation to directory structure
-        module_path = module.replace('.', '/')
-        
-        # Check for .java file
-        java_path = f"{module_path}.java"
-        full_path = os.path.join(base_path, java_path)
-        if os.path.exists(full_path):
-            return java_path
-        
-        return None
-
-_exported_functions = {}  # Global registry of exported functions 
\ No newline at end of file
@@ -0,0 +1,82 @@
+from typing import Dict, List, Optional
+
+# Version of the columnar layout, bumped when decoders need to change
+COLUMNAR_VERSION = 1
+
+# Node keys stored in columns; every other key goes to the node's details
+COLUMN_KEYS = ('name', 'path', 'type', 'size', 'extension', 'children')
+
+
+class StringTable:
+    """Interns strings to their index in a list, in first-seen order."""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        """Get the index of a string, adding it on first use."""
+        index = self._ids.get(value)
+        if index is None:
+            index = self._ids[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+def to_columnar(tree: Dict) -> Dict:
+    """
+    Convert a nested file tree to the columnar wire format.
+
+    Nodes are numbered in pre-order, so a parent always comes before its
+    children. Names, types and extensions are indexes into one string table;
+    parent is the number of the parent node (-1 for the root), and a node's
+    path is its parent's path joined with its name, so paths are not sent.
+    Sizes are numbers or null, extensions -1 when a node has none. All other
+    keys of a node (functions, imports, ...) are kept as a dict in details,
+    which is null for nodes without any.
+
+    Args:
+        tree: Root of the tree, with 'children' lists on directories
+
+    Returns:
+        Dict with the string table, the root path and the parallel arrays
+    """
+    strings = StringTable()
+    names, parents, types, sizes, extensions = [], [], [], [], []
+    details: List[Optional[Dict]] = []
+    root_path = tree.get('path', '')
+
+    stack = [(tree, -1, root_path)]
+    while stack:
+        node, parent, path = stack.pop()
+        node_id = len(names)
+
+        names.append(strings.intern(node.get('name', '')))
+        parents.append(parent)
+        types.append(strings.intern(node.get('type', '')))
+        sizes.append(node.get('size'))
+        extension = node.get('extension')
+        extensions.append(strings.intern(extension) if extension is not None else -1)
+
+        extra = {key: value for key, value in node.items() if key not in COLUMN_KEYS}
+        # Keep paths that do not follow from the name, so the format stays lossless
+        if node.get('path', path) != path:
+            extra['path'] = node['path']
+        details.append(extra or None)
+
+        base = node.get('path', path).rstrip('/')
+        for child in reversed(node.get('children', [])):
+            stack.append((child, node_id, f"{base}/{child.get('name', '')}"))
+
+    return {
+        'format': 'columnar',
+        'version': COLUMNAR_VERSION,
+        'root_path': root_path,
+        'strings': strings.strings,
+        'name': names,
+        'parent': parents,
+        'type': types,
+        'size': sizes,
+        'extension': extensions,
+        'details': details
+    }
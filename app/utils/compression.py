@@ -0,0 +1,86 @@
+import gzip
+from typing import Optional
+
+from flask import request
+
+from app.utils.config_utils import get_config
+
+# Optional codecs, used when their packages are installed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content-Encoding tokens this server can produce, most preferred first
+ENCODINGS = [encoding for encoding, codec in (('zstd', zstandard), ('br', brotli), ('gzip', gzip)) if codec]
+
+# File extensions of precompressed payloads, by encoding
+ENCODING_EXTENSIONS = {'zstd': 'zst', 'br': 'br', 'gzip': 'gz'}
+
+# Only these response types are worth compressing
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+
+
+def negotiate_encoding(accept_encodings) -> Optional[str]:
+    """
+    Pick the encoding to send a response in.
+
+    Args:
+        accept_encodings: The request's parsed Accept-Encoding header
+
+    Returns:
+        The accepted encoding with the highest quality, ties broken by
+        ENCODINGS order, or None to send the response uncompressed
+    """
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress data with one of the ENCODINGS."""
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    # mtime=0 keeps the output identical for identical data
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def min_compress_bytes() -> int:
+    """Get the size below which responses are sent uncompressed."""
+    return int(get_config('COMPRESSION_MIN_BYTES', 1024))
+
+
+def compress_response(response):
+    """
+    Compress a response body for the client, as an after_request handler.
+
+    Streamed, already encoded, non-JSON/text and small responses are sent as they are.
+    """
+    if response.status_code < 200 or response.status_code in (204, 304) or response.is_streamed:
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if 'Content-Encoding' in response.headers or response.content_length is None or response.content_length < min_compress_bytes():
+        return response
+
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding:
+        response.set_data(compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+        # The compressed body is a different representation, so it needs its own strong ETag
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f"{etag}-{encoding}")
+    return response
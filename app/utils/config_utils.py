@@ -0,0 +1,9 @@
+from typing import Any
+from flask import current_app, has_app_context
+
+
+def get_config(key: str, default: Any = None) -> Any:
+    """Read a config value, falling back to the default outside an app context."""
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
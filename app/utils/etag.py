@@ -0,0 +1,38 @@
+import hashlib
+from typing import Optional
+
+from flask import Response, request
+
+from app.utils.compression import ENCODINGS
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag value from the parts that identify a representation."""
+    return hashlib.sha1('\0'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def matching_etag(etag: str) -> Optional[str]:
+    """
+    Get the tag of the request's If-None-Match header that matches etag.
+
+    Compressed responses carry the ETag with a '-<encoding>' suffix, so those
+    tags match as well.
+
+    Returns:
+        The matching tag, or None if the client's copy is not current
+    """
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    for tag in [etag] + [f"{etag}-{encoding}" for encoding in ENCODINGS]:
+        if if_none_match.contains(tag):
+            return tag
+    return None
+
+
+def not_modified(etag: str) -> Response:
+    """Build a 304 Not Modified response for a matching tag."""
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    return response
@@ -1,8 +1,89 @@
+import json
+from datetime import date
+from typing import Any
+
+from flask import current_app
 from flask.json import JSONEncoder
 from bson import ObjectId
+from werkzeug.http import http_date
+
+from app.utils.config_utils import get_config
+
+# orjson is used for serialization when it is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class MongoJSONEncoder(JSONEncoder):
     def default(self, obj):
         if isinstance(obj, ObjectId):
             return str(obj)
-        return super().default(obj) 
\ No newline at end of file
+        return super().default(obj)
+
+
+def _default(obj: Any) -> Any:
+    """Convert the types orjson does not serialize the way Flask does."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    # Flask sends dates as HTTP dates, keep that instead of orjson's ISO 8601
+    if isinstance(obj, date):
+        return http_date(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_orjson(data: Any, sort_keys: bool = False, pretty: bool = False) -> bytes:
+    """Serialize data with orjson."""
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, default=_default, option=option)
+
+
+def dumps_stdlib(data: Any, sort_keys: bool = False, pretty: bool = False) -> bytes:
+    """Serialize data with the json module and MongoJSONEncoder."""
+    if pretty:
+        return json.dumps(data, cls=MongoJSONEncoder, sort_keys=sort_keys, indent=2).encode('utf-8')
+    return json.dumps(data, cls=MongoJSONEncoder, sort_keys=sort_keys, separators=(',', ':')).encode('utf-8')
+
+
+def dumps(data: Any, sort_keys: bool = False, pretty: bool = False) -> bytes:
+    """
+    Serialize data to UTF-8 JSON bytes.
+
+    orjson is used when it is installed, unless JSON_SERIALIZER is 'stdlib';
+    data orjson rejects (integers wider than 64 bits) falls back to the
+    json module. ObjectIds become strings and dates HTTP dates either way.
+    """
+    if orjson is not None and get_config('JSON_SERIALIZER', 'auto') != 'stdlib':
+        try:
+            return dumps_orjson(data, sort_keys, pretty)
+        except orjson.JSONEncodeError:
+            pass
+    return dumps_stdlib(data, sort_keys, pretty)
+
+
+def jsonify(*args, **kwargs):
+    """
+    Drop-in replacement for flask.jsonify that serializes with dumps().
+
+    Follows the JSON_SORT_KEYS, JSONIFY_PRETTYPRINT_REGULAR and
+    JSONIFY_MIMETYPE settings like flask.jsonify.
+    """
+    if args and kwargs:
+        raise TypeError("jsonify() behavior undefined when passed both args and kwargs")
+    data = args[0] if len(args) == 1 else (args or kwargs)
+
+    return current_app.response_class(response_body(data), mimetype=current_app.config['JSONIFY_MIMETYPE'])
+
+
+def response_body(data: Any) -> bytes:
+    """Serialize data to the exact body jsonify() sends for it."""
+    config = current_app.config
+    pretty = config['JSONIFY_PRETTYPRINT_REGULAR'] or current_app.debug
+    return dumps(data, sort_keys=config['JSON_SORT_KEYS'], pretty=pretty) + b'\n'
@@ -0,0 +1,378 @@
+import ast
+import re
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.utils.line_index import LineIndex
+from app.utils.parse_budget import ParseBudget, ParseBudgetExceeded
+from app.utils.python_symbols import PythonSymbolVisitor
+from app.utils.scope_scanner import ScopeTable, scan_scopes
+
+# Patterns only start at word boundaries and bound the spans they skip over
+# (parameter lists, import clauses), so pathological input cannot make a
+# single match backtrack through the rest of the file.
+
+# Function calls inside JavaScript/TypeScript/Java function bodies
+CALL_PATTERN = re.compile(r'\b(\w+)\s*\(')
+CALL_KEYWORDS = frozenset(('if', 'for', 'while', 'switch', 'catch'))
+
+# JavaScript/TypeScript declarations
+JS_FUNCTION_PATTERNS = [
+    re.compile(r'\b(?:export\s+)?(?:async\s+)?function\s+(\w+)'),  # function declarations
+    re.compile(r'\b(?:export\s+)?const\s+(\w+)\s*=\s*(?:async\s+)?function'),  # function expressions
+    re.compile(r'\b(?:export\s+)?const\s+(\w+)\s*=\s*(?:async\s+)?\('),  # arrow functions
+]
+JS_CLASS_PATTERN = re.compile(r'\b(?:export\s+)?class\s+(\w+)')
+JS_METHOD_PATTERN = re.compile(r'\b(?:async\s+)?(\w+)\s*\([^)]{0,1000}\)\s*{')
+JS_EXCLUDED_METHODS = ('constructor', 'get', 'set')
+
+# Tokens that delimit a function signature and an arrow function's expression body
+JS_BRACKET_TOKEN = re.compile(r'[()[\]]')
+JS_RETURN_TYPE = re.compile(r'\s*(?::[^{;=]{0,500})?')  # optional TypeScript return type
+JS_ARROW = re.compile(r'=>\s*')
+JS_STATEMENT_TOKEN = re.compile(r'[()[\]{};,\n]')
+
+# JavaScript/TypeScript imports, as (pattern, is_named)
+JS_IMPORT_PATTERNS = [
+    (re.compile(r'\bimport\s+{([^}]{1,2000})}\s+from\s+[\'"]([^\'"\n]{1,500})[\'"]'), True),  # Named imports
+    (re.compile(r'\bimport\s+(\w+)\s+from\s+[\'"]([^\'"\n]{1,500})[\'"]'), False),  # Default imports
+    (re.compile(r'\bimport\s+\*\s+as\s+(\w+)\s+from\s+[\'"]([^\'"\n]{1,500})[\'"]'), False),  # Namespace imports
+]
+
+# Java declarations and imports
+JAVA_CLASS_PATTERN = re.compile(r'\bclass\s+(\w+)')
+JAVA_METHOD_PATTERN = re.compile(r'\b(?:(?:public|private|protected)\s+)?(?:static\s+)?[\w<>[\]]+\s+(\w+)\s*\([^)]{0,1000}\)\s*{')
+JAVA_IMPORT_PATTERN = re.compile(r'\bimport\s+([^;]{1,500});')
+
+
+class LanguageExtractor(ABC):
+    """
+    Extracts functions, classes and imports from the source of one language.
+
+    Subclasses implement extract_symbols() and extract_imports(); extract()
+    runs both on a decoded file and returns only the non-empty results, so an
+    analyzer needs a single call per file. Every step gets the file's
+    ParseBudget and calls its check() as it goes.
+    """
+
+    language = None
+
+    def extract(self, content: str, file_rel_path: str, budget: Optional[ParseBudget] = None) -> Dict:
+        """
+        Extract the symbols of a file.
+
+        Args:
+            content: Decoded file content with '\\n' newlines
+            file_rel_path: Tree path of the file ('/src/app.js'), used in error messages
+            budget: CPU-time budget of the extraction, unlimited if not given
+
+        Returns:
+            Dict with 'functions', 'classes' and 'imports' lists, each only if
+            non-empty. If the budget runs out, extraction is abandoned and the
+            dict holds 'truncated': True next to the steps that completed.
+        """
+        budget = budget or ParseBudget()
+        result = {}
+
+        try:
+            parsed = self.parse(content, file_rel_path, budget)
+
+            try:
+                functions, classes = self.extract_symbols(content, file_rel_path, parsed, budget)
+            except ParseBudgetExceeded:
+                raise
+            except Exception as e:
+                print(f"Error extracting functions and classes from {file_rel_path}: {e}")
+                functions, classes = [], []
+            if functions:
+                result['functions'] = functions
+            if classes:
+                result['classes'] = classes
+
+            try:
+                imports = self.extract_imports(content, parsed, budget)
+            except ParseBudgetExceeded:
+                raise
+            except Exception as e:
+                print(f"Error extracting imports from {file_rel_path}: {e}")
+                imports = []
+            if imports:
+                result['imports'] = imports
+        except ParseBudgetExceeded:
+            print(f"Parse budget exceeded for {file_rel_path}, extraction truncated")
+            result['truncated'] = True
+
+        return result
+
+    def parse(self, content: str, file_rel_path: str, budget: ParseBudget):
+        """Parse the content once for both extraction steps; returns None by default."""
+        return None
+
+    @abstractmethod
+    def extract_symbols(self, content: str, file_rel_path: str, parsed, budget: ParseBudget) -> Tuple[List[Dict], List[Dict]]:
+        """Extract the functions and classes of a file."""
+
+    @abstractmethod
+    def extract_imports(self, content: str, parsed, budget: ParseBudget) -> List[Dict]:
+        """Extract the imports of a file."""
+
+
+class BraceLanguageExtractor(LanguageExtractor):
+    """Base for C-like languages whose function and class bodies are brace-delimited scopes."""
+
+    def parse(self, content: str, file_rel_path: str, budget: ParseBudget) -> Tuple[ScopeTable, LineIndex]:
+        return scan_scopes(content, budget), LineIndex(content)
+
+    def build_function_entry(self, content: str, match: re.Match, entry_type: str, body_end: int, line_index: LineIndex, budget: ParseBudget) -> Dict:
+        """Build a function or method entry whose body ends at the body_end offset."""
+        dependencies = self.extract_function_dependencies(content, line_index, budget, match.end(), body_end + 1)
+
+        return {
+            'name': match.group(1),
+            'type': entry_type,
+            'start_line': line_index.line_of(match.start(1)),
+            'end_line': line_index.line_of(body_end),
+            'dependencies': dependencies
+        }
+
+    def build_class_entry(self, content: str, match: re.Match, method_pattern: re.Pattern, excluded_methods: Iterable[str], scopes: ScopeTable, line_index: LineIndex, budget: ParseBudget) -> Dict:
+        """Build a class entry with the methods declared directly in its body."""
+        class_index = scopes.first_after(match.end())
+        class_end = len(content) - 1
+        methods = []
+
+        if class_index is not None:
+            class_open, class_end = scopes.span(class_index)
+            for method_match in method_pattern.finditer(content, class_open + 1, class_end):
+                budget.check()
+                if method_match.group(1) in excluded_methods:
+                    continue
+
+                # Skip control blocks, nested classes and matches inside strings or comments
+                method_index = scopes.opened_at(method_match.end() - 1)
+                if method_index is None or scopes.parents[method_index] != class_index:
+                    continue
+
+                methods.append(self.build_function_entry(content, method_match, 'method', scopes.closes[method_index], line_index, budget))
+
+        return {
+            'name': match.group(1),
+            'type': 'class',
+            'start_line': line_index.line_of(match.start(1)),
+            'end_line': line_index.line_of(class_end),
+            'methods': methods
+        }
+
+    def extract_function_dependencies(self, content: str, line_index: LineIndex, budget: ParseBudget, start: int = 0, end: Optional[int] = None) -> List[Dict]:
+        """
+        Extract the function calls in the content[start:end] span of a file.
+
+        Calls are recorded by bare name; they are resolved to their defining
+        files once the whole repository is analyzed.
+        """
+        dependencies = []
+
+        for match in CALL_PATTERN.finditer(content, start, len(content) if end is None else end):
+            budget.check()
+            func_name = match.group(1)
+            # Skip keywords followed by a parenthesis
+            if func_name not in CALL_KEYWORDS:
+                dependencies.append({
+                    'target': func_name,
+                    'type': 'call',
+                    'line': line_index.line_of(match.start())
+                })
+
+        return dependencies
+
+
+class JavaScriptExtractor(BraceLanguageExtractor):
+    """JavaScript and TypeScript, including JSX/TSX."""
+
+    language = 'javascript'
+
+    def extract_symbols(self, content, file_rel_path, parsed, budget):
+        scopes, line_index = parsed
+        functions = []
+        classes = []
+
+        brackets = None
+        for pattern in JS_FUNCTION_PATTERNS:
+            for match in pattern.finditer(content):
+                budget.check()
+                if scopes.is_code(match.start(1)):
+                    # Matched once per file, so no function rescans the rest of the file for its brackets
+                    brackets = brackets or self.match_brackets(content, scopes, budget)
+                    body_end = self.find_function_end(content, match.end() - 1, scopes, brackets, budget)
+                    functions.append(self.build_function_entry(content, match, 'function', body_end, line_index, budget))
+
+        for match in JS_CLASS_PATTERN.finditer(content):
+            budget.check()
+            if scopes.is_code(match.start(1)):
+                classes.append(self.build_class_entry(content, match, JS_METHOD_PATTERN, JS_EXCLUDED_METHODS, scopes, line_index, budget))
+
+        return functions, classes
+
+    def match_brackets(self, content: str, scopes: ScopeTable, budget: ParseBudget) -> Tuple[List[int], Dict[int, int]]:
+        """
+        Match the parentheses and square brackets in code in a single pass.
+
+        Returns:
+            Tuple of the offsets of the opening parentheses, in order, and a dict
+            mapping the offset of every closed '(' and '[' to that of its closer
+        """
+        paren_opens = []
+        closes = {}
+        stack = []
+        for match in JS_BRACKET_TOKEN.finditer(content):
+            budget.check()
+            offset = match.start()
+            if not scopes.is_code(offset):
+                continue
+            token = match.group()
+            if token in '([':
+                stack.append(offset)
+                if token == '(':
+                    paren_opens.append(offset)
+            elif stack:
+                closes[stack.pop()] = offset
+        return paren_opens, closes
+
+    def find_function_end(self, content: str, start: int, scopes: ScopeTable, brackets: Tuple[List[int], Dict[int, int]], budget: ParseBudget) -> int:
+        """Get the offset where the function whose parameter list follows start ends."""
+        # Skip the parameter list, which may hold default values with braces
+        paren_opens, closes = brackets
+        index = bisect_left(paren_opens, start)
+        if index == len(paren_opens) or paren_opens[index] not in closes:
+            # Unbalanced, the function's extent is unknown
+            return start
+        params_end = closes[paren_opens[index]] + 1
+
+        # Only a scope opening right after the signature or the arrow is the body
+        pos = JS_RETURN_TYPE.match(content, params_end).end()
+        arrow = JS_ARROW.match(content, pos)
+        if arrow:
+            pos = arrow.end()
+        body_index = scopes.opened_at(pos)
+        if body_index is not None:
+            return scopes.closes[body_index]
+        return self.find_statement_end(content, pos, scopes, closes, budget)
+
+    def find_statement_end(self, content: str, start: int, scopes: ScopeTable, closes: Dict[int, int], budget: ParseBudget) -> int:
+        """Get the offset of the end of the expression starting at start, such as an arrow function's body."""
+        pos = start
+        while True:
+            match = JS_STATEMENT_TOKEN.search(content, pos)
+            if not match:
+                return len(content) - 1
+            budget.check()
+            offset = match.start()
+            pos = offset + 1
+            if not scopes.is_code(offset):
+                continue
+            token = match.group()
+            if token in '([':
+                # Jump over nested brackets; an unclosed one ends the expression
+                if offset not in closes:
+                    return offset
+                pos = closes[offset] + 1
+            elif token == '{':
+                scope = scopes.opened_at(offset)
+                if scope is not None:
+                    pos = scopes.closes[scope] + 1
+            else:
+                # A separator, or a closing bracket of the enclosing expression
+                return offset
+
+    def extract_imports(self, content, parsed, budget):
+        imports = []
+        for pattern, is_named in JS_IMPORT_PATTERNS:
+            for match in pattern.finditer(content):
+                budget.check()
+                if is_named:
+                    symbols = [s.strip() for s in match.group(1).split(',')]
+                else:
+                    symbols = [match.group(1)]
+                imports.append({
+                    'source': match.group(2),
+                    'type': 'module',
+                    'symbols': symbols
+                })
+        return imports
+
+
+class JavaExtractor(BraceLanguageExtractor):
+    """Java classes with their methods, and package imports."""
+
+    language = 'java'
+
+    def extract_symbols(self, content, file_rel_path, parsed, budget):
+        scopes, line_index = parsed
+        classes = []
+
+        for match in JAVA_CLASS_PATTERN.finditer(content):
+            budget.check()
+            if scopes.is_code(match.start(1)):
+                classes.append(self.build_class_entry(content, match, JAVA_METHOD_PATTERN, (), scopes, line_index, budget))
+
+        return [], classes
+
+    def extract_imports(self, content, parsed, budget):
+        imports = []
+        for match in JAVA_IMPORT_PATTERN.finditer(content):
+            budget.check()
+            import_path = match.group(1)
+            imports.append({
+                'source': import_path,
+                'type': 'package',
+                'symbols': [import_path.split('.')[-1]]
+            })
+        return imports
+
+
+class PythonExtractor(LanguageExtractor):
+    """
+    Python modules, parsed once with ast; files that do not parse yield nothing.
+
+    ast.parse() cannot be interrupted, so the budget applies to the walk over
+    the parsed tree; parsing itself is linear and bounded by the file size cap.
+    """
+
+    language = 'python'
+
+    def parse(self, content: str, file_rel_path: str, budget: ParseBudget) -> Optional[PythonSymbolVisitor]:
+        try:
+            return PythonSymbolVisitor.collect(ast.parse(content), budget)
+        except (SyntaxError, ValueError, RecursionError):
+            return None
+
+    def extract_symbols(self, content, file_rel_path, parsed, budget):
+        if parsed is None:
+            return [], []
+        return parsed.functions, parsed.classes
+
+    def extract_imports(self, content, parsed, budget):
+        if parsed is None:
+            return []
+        return parsed.imports
+
+
+# Extractors by file extension; the analyzers look a file's extension up once
+EXTRACTORS: Dict[str, LanguageExtractor] = {}
+
+
+def register_extractor(extensions: Iterable[str], extractor: LanguageExtractor) -> None:
+    """Register an extractor for files with any of the given extensions ('.js')."""
+    for extension in extensions:
+        EXTRACTORS[extension] = extractor
+
+
+def get_extractor(extension: str) -> Optional[LanguageExtractor]:
+    """Get the extractor for a file extension ('.py'), or None if the language is not analyzed."""
+    return EXTRACTORS.get(extension)
+
+
+register_extractor(('.js', '.jsx', '.ts', '.tsx'), JavaScriptExtractor())
+register_extractor(('.py',), PythonExtractor())
+register_extractor(('.java',), JavaExtractor())
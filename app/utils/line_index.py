@@ -0,0 +1,30 @@
+from bisect import bisect_left
+from typing import List, Optional
+
+
+class LineIndex:
+    """
+    Maps character offsets of a text to 1-based line numbers.
+
+    The newline offsets are collected once, on the first lookup, so every later
+    lookup is a binary search instead of counting newlines in a prefix copy.
+    """
+
+    def __init__(self, content: str):
+        self._content = content
+        self._newlines: Optional[List[int]] = None
+
+    def _build(self) -> List[int]:
+        newlines = []
+        content = self._content
+        pos = content.find('\n')
+        while pos != -1:
+            newlines.append(pos)
+            pos = content.find('\n', pos + 1)
+        return newlines
+
+    def line_of(self, offset: int) -> int:
+        """Get the line number of the character at offset."""
+        if self._newlines is None:
+            self._newlines = self._build()
+        return bisect_left(self._newlines, offset) + 1
@@ -0,0 +1,32 @@
+import time
+from typing import Optional
+
+# Clock reads are skipped for this many checks in a row; a check is otherwise a counter increment
+CHECK_INTERVAL = 32
+
+
+class ParseBudgetExceeded(Exception):
+    """Raised when extracting a file uses up its CPU-time budget."""
+
+
+class ParseBudget:
+    """
+    CPU-time budget for extracting one file.
+
+    Extractors call check() between regex matches and tree nodes. The patterns
+    they use have bounded repetitions, so no single match can run away and the
+    budget is enforced to within a few matches. Time is measured with
+    time.thread_time(), so other threads and processes do not eat into it.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.deadline = time.thread_time() + seconds if seconds else None
+        self._checks = 0
+
+    def check(self) -> None:
+        """Raise ParseBudgetExceeded if the budget is used up."""
+        if self.deadline is None:
+            return
+        self._checks += 1
+        if self._checks % CHECK_INTERVAL == 0 and time.thread_time() > self.deadline:
+            raise ParseBudgetExceeded()
@@ -0,0 +1,163 @@
+import os
+import re
+from typing import Iterable, List, Optional, Pattern, Tuple
+
+from app.utils.config_utils import get_config
+
+# Dependency, build and cache directories skipped unless ANALYSIS_IGNORE_DIRS overrides them
+DEFAULT_IGNORED_DIRS = (
+    'node_modules', 'bower_components', 'vendor', 'dist', 'build', 'target',
+    'coverage', '.next', '.nuxt', '__pycache__', '.venv', 'venv', '.tox',
+)
+
+# File name suffixes of minified or bundled output
+GENERATED_SUFFIXES = ('.min.js', '.min.css', '.bundle.js', '-min.js', '.min.mjs')
+
+# Files larger than this whose lines average more than GENERATED_AVG_LINE_LENGTH
+# characters are treated as minified; small one-liners are left alone
+GENERATED_MIN_SIZE = 2048
+GENERATED_AVG_LINE_LENGTH = 300
+
+# Markers code generators put in the first lines of their output
+GENERATED_MARKERS = ('@generated', 'DO NOT EDIT')
+GENERATED_HEADER_SIZE = 1024
+
+# Bytes read from the start of a file to tell binary from text content
+BINARY_SNIFF_BYTES = 8192
+
+
+def is_binary(prefix: bytes) -> bool:
+    """Check whether the first bytes of a file mark it as binary (they contain a NUL byte)."""
+    return b'\0' in prefix
+
+
+def is_generated_name(name: str) -> bool:
+    """Check whether a file name marks minified or bundled output."""
+    return name.endswith(GENERATED_SUFFIXES)
+
+
+def is_generated_content(content: str) -> bool:
+    """Check whether file content looks minified or machine-generated."""
+    header = content[:GENERATED_HEADER_SIZE]
+    if any(marker in header for marker in GENERATED_MARKERS):
+        return True
+
+    if len(content) < GENERATED_MIN_SIZE:
+        return False
+    return len(content) / (content.count('\n') + 1) > GENERATED_AVG_LINE_LENGTH
+
+
+def _compile_gitignore_pattern(pattern: str) -> Pattern:
+    """Translate a .gitignore glob into a regex matched against '/'-separated relative paths."""
+    # A slash anywhere but the end anchors the pattern to the repository root
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            regex += '/.*'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        elif pattern[i] == '[' and pattern.find(']', i + 1) != -1:
+            end = pattern.find(']', i + 1)
+            char_class = pattern[i + 1:end].replace('\\', '\\\\')
+            if char_class.startswith('!'):
+                char_class = '^' + char_class[1:]
+            regex += '[' + char_class + ']'
+            i = end + 1
+        elif pattern[i] == '\\' and i + 1 < len(pattern):
+            regex += re.escape(pattern[i + 1])
+            i += 2
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+
+    return re.compile(('^' if anchored else '(?:^|.*/)') + regex + '$')
+
+
+def parse_gitignore(lines: Iterable[str]) -> List[Tuple[Pattern, bool, bool]]:
+    """
+    Parse .gitignore lines into (regex, negated, directory_only) rules.
+
+    Supports comments, '!' negation, trailing '/' for directories, leading or
+    inner '/' anchoring and '*', '?', '[...]' and '**' wildcards.
+    """
+    rules = []
+    for line in lines:
+        line = line.rstrip('\n').rstrip('\r')
+        if not line.endswith('\\ '):
+            line = line.rstrip(' ')
+        if not line or line.startswith('#'):
+            continue
+
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        elif line.startswith('\\'):
+            line = line[1:]
+
+        directory_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+
+        rules.append((_compile_gitignore_pattern(line), negated, directory_only))
+    return rules
+
+
+class PathFilter:
+    """
+    Decides which repository paths are skipped by the walker.
+
+    A path is ignored when one of its directories is on the deny-list or when the
+    last matching rule of the repository's root .gitignore excludes it. Ignored
+    directories are not descended into, so their contents are never listed.
+    """
+
+    def __init__(self, ignored_dirs: Iterable[str] = DEFAULT_IGNORED_DIRS, gitignore_rules: Optional[List[Tuple[Pattern, bool, bool]]] = None):
+        self.ignored_dirs = frozenset(ignored_dirs)
+        self.gitignore_rules = gitignore_rules or []
+
+    @classmethod
+    def for_repository(cls, repo_path: str) -> 'PathFilter':
+        """Build the filter for a cloned repository from ANALYSIS_IGNORE_DIRS and its .gitignore."""
+        ignored_dirs = get_config('ANALYSIS_IGNORE_DIRS')
+        if ignored_dirs is None:
+            ignored_dirs = DEFAULT_IGNORED_DIRS
+        elif isinstance(ignored_dirs, str):
+            ignored_dirs = [name.strip() for name in ignored_dirs.split(',') if name.strip()]
+
+        rules = []
+        try:
+            with open(os.path.join(repo_path, '.gitignore'), 'r', encoding='utf-8', errors='ignore') as f:
+                rules = parse_gitignore(f)
+        except OSError:
+            pass
+
+        return cls(ignored_dirs, rules)
+
+    def is_ignored(self, path: str, is_dir: bool) -> bool:
+        """Check whether a '/'-separated path relative to the repository root is skipped."""
+        if is_dir and path.rsplit('/', 1)[-1] in self.ignored_dirs:
+            return True
+
+        ignored = False
+        for regex, negated, directory_only in self.gitignore_rules:
+            if directory_only and not is_dir:
+                continue
+            if ignored == negated and regex.match(path):
+                ignored = not negated
+        return ignored
@@ -0,0 +1,101 @@
+import ast
+from typing import Dict, List, Optional
+
+from app.utils.parse_budget import ParseBudget
+
+
+class PythonSymbolVisitor(ast.NodeVisitor):
+    """
+    Collects functions, classes, methods, calls and imports of a Python module in one pass.
+
+    A scope stack tracks the enclosing classes and functions, so every node is
+    visited exactly once: calls are attributed to the innermost enclosing
+    function and functions defined directly in a class body are also recorded
+    as methods of that class. The budget is checked once per node.
+    """
+
+    def __init__(self, budget: Optional[ParseBudget] = None):
+        self.functions: List[Dict] = []
+        self.classes: List[Dict] = []
+        self.imports: List[Dict] = []
+        self._scopes: List[Dict] = []
+        self._budget = budget or ParseBudget()
+
+    @classmethod
+    def collect(cls, tree: ast.AST, budget: Optional[ParseBudget] = None) -> 'PythonSymbolVisitor':
+        """Visit a parsed module and return the visitor holding its symbols."""
+        visitor = cls(budget)
+        visitor.visit(tree)
+        return visitor
+
+    def visit(self, node):
+        self._budget.check()
+        return super().visit(node)
+
+    def visit_FunctionDef(self, node):
+        dependencies = []
+        self.functions.append({
+            'name': node.name,
+            'type': 'function',
+            'start_line': node.lineno,
+            'end_line': node.end_lineno,
+            'dependencies': dependencies
+        })
+
+        if self._scopes and self._scopes[-1]['type'] == 'class':
+            self._scopes[-1]['methods'].append({
+                'name': node.name,
+                'type': 'method',
+                'start_line': node.lineno,
+                'end_line': node.end_lineno,
+                'dependencies': dependencies
+            })
+
+        self._scopes.append({'type': 'function', 'dependencies': dependencies})
+        self.generic_visit(node)
+        self._scopes.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node):
+        methods = []
+        self.classes.append({
+            'name': node.name,
+            'type': 'class',
+            'start_line': node.lineno,
+            'end_line': node.end_lineno,
+            'methods': methods
+        })
+
+        self._scopes.append({'type': 'class', 'methods': methods})
+        self.generic_visit(node)
+        self._scopes.pop()
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name):
+            for scope in reversed(self._scopes):
+                if scope['type'] == 'function':
+                    scope['dependencies'].append({
+                        'target': node.func.id,
+                        'type': 'call',
+                        'line': node.lineno
+                    })
+                    break
+        self.generic_visit(node)
+
+    def visit_Import(self, node):
+        for name in node.names:
+            self.imports.append({
+                'source': name.name,
+                'type': 'module',
+                'symbols': [name.asname or name.name]
+            })
+
+    def visit_ImportFrom(self, node):
+        # 'level' counts the leading dots of relative imports ('from ..util import x')
+        self.imports.append({
+            'source': node.module or '',
+            'type': 'module',
+            'symbols': [n.name for n in node.names],
+            'level': node.level
+        })
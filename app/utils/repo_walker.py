@@ -0,0 +1,122 @@
+import os
+import posixpath
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from app.utils.path_filter import PathFilter
+
+# Directories that are never part of a repository's contents
+DEFAULT_SKIP_DIRS = ('.git',)
+
+
+class WalkEntry(NamedTuple):
+    """A file or directory found by the repository walker."""
+    path: str  # Relative to the repository root, '/'-separated
+    size: int
+    mtime: int  # Nanoseconds, as st_mtime_ns
+    is_dir: bool
+
+
+def normalize_subdirectory(path: Optional[str]) -> str:
+    """
+    Normalize a requested repository directory ('/src/components/') to a walk start ('src/components').
+
+    The root is '.'. '..' components cannot climb above the repository root.
+    """
+    if not path:
+        return '.'
+    normalized = posixpath.normpath('/' + path.replace('\\', '/')).lstrip('/')
+    return normalized or '.'
+
+
+def is_walkable_directory(repo_path: str, rel_dir: str, skip_dirs: Tuple[str, ...] = DEFAULT_SKIP_DIRS, path_filter: Optional[PathFilter] = None) -> bool:
+    """Check that a normalized directory exists and that walking the whole repository would reach it."""
+    if rel_dir == '.':
+        return os.path.isdir(repo_path)
+
+    parts = rel_dir.split('/')
+    for index, part in enumerate(parts):
+        if part in skip_dirs:
+            return False
+        if path_filter is not None and path_filter.is_ignored('/'.join(parts[:index + 1]), True):
+            return False
+
+    # Symlinked directories are never descended into
+    current = repo_path
+    for part in parts:
+        current = os.path.join(current, part)
+        if os.path.islink(current):
+            return False
+    return os.path.isdir(current)
+
+
+def entry_depth(path: str, start: str = '.') -> int:
+    """Get the depth of a walked path below a walk start; the start's own entries are at depth 1."""
+    start_depth = 0 if start == '.' else start.count('/') + 1
+    return path.count('/') + 1 - start_depth
+
+
+def walk_directories(repo_path: str, skip_dirs: Tuple[str, ...] = DEFAULT_SKIP_DIRS, path_filter: Optional[PathFilter] = None,
+                     start: str = '.', max_depth: Optional[int] = None) -> Iterator[Tuple[str, List[WalkEntry]]]:
+    """Walk a repository top-down from start and yield (relative directory path, entries) per directory, in os.walk() order."""
+    visited = set()
+    stack = [(start, 0)]
+
+    while stack:
+        rel_dir, depth = stack.pop()
+        abs_dir = repo_path if rel_dir == '.' else os.path.join(repo_path, rel_dir)
+        prefix = '' if rel_dir == '.' else rel_dir + '/'
+
+        try:
+            with os.scandir(abs_dir) as scanner:
+                dir_entries = list(scanner)
+            dir_stat = os.stat(abs_dir)
+        except OSError:
+            continue
+
+        # A directory reachable twice (bind mounts, hard links) is walked once, so the walk cannot loop
+        dir_key = (dir_stat.st_dev, dir_stat.st_ino)
+        if dir_key in visited:
+            continue
+        visited.add(dir_key)
+
+        dirs = []
+        files = []
+        subdirs = []
+        for entry in dir_entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir and entry.name in skip_dirs:
+                continue
+            if path_filter is not None and path_filter.is_ignored(prefix + entry.name, is_dir):
+                continue
+
+            if is_dir:
+                dirs.append(WalkEntry(prefix + entry.name, 0, 0, True))
+                # Symlinked directories and those at max_depth are listed but not walked
+                if not entry.is_symlink() and (max_depth is None or depth + 1 < max_depth):
+                    subdirs.append((prefix + entry.name, depth + 1))
+                continue
+
+            try:
+                stat = entry.stat()
+            except OSError:
+                # Broken symlink, describe the link itself
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+            files.append(WalkEntry(prefix + entry.name, stat.st_size, stat.st_mtime_ns, False))
+
+        yield rel_dir, dirs + files
+
+        # Push in reverse so subdirectories are walked in listing order
+        stack.extend(reversed(subdirs))
+
+
+def walk_repository(repo_path: str, skip_dirs: Tuple[str, ...] = DEFAULT_SKIP_DIRS, path_filter: Optional[PathFilter] = None) -> Iterator[WalkEntry]:
+    """Walk a repository and yield one WalkEntry per file and directory, in os.walk() order."""
+    for _, entries in walk_directories(repo_path, skip_dirs, path_filter):
+        yield from entries
@@ -0,0 +1,158 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+
+from app.utils.parse_budget import ParseBudget
+
+# Tokens that matter for brace matching in C-like languages (JavaScript, TypeScript, Java)
+_CODE_TOKEN = re.compile(r'//|/\*|[{}\'"`]')
+_STRING_END = {
+    '"': re.compile(r'["\\\n]'),
+    "'": re.compile(r"['\\\n]"),
+}
+_TEMPLATE_TOKEN = re.compile(r'[`\\]|\$\{')
+
+# Marker pushed on the brace stack for the ${ ... } expressions of template literals
+_TEMPLATE_EXPRESSION = -1
+
+
+class ScopeTable:
+    """
+    Brace-delimited scopes of a source file, produced by scan_scopes().
+
+    Scopes are numbered in the order their opening braces appear. For each scope
+    the table holds the offsets of its opening and closing brace and the index of
+    the enclosing scope (-1 at the top level). It also records the spans of
+    strings and comments so matches inside them can be told apart from code.
+    """
+
+    def __init__(self, opens: List[int], closes: List[int], parents: List[int],
+                 literal_starts: List[int], literal_ends: List[int]):
+        self.opens = opens
+        self.closes = closes
+        self.parents = parents
+        self._literal_starts = literal_starts
+        self._literal_ends = literal_ends
+        self._by_open = {offset: index for index, offset in enumerate(opens)}
+
+    def __len__(self) -> int:
+        return len(self.opens)
+
+    def first_after(self, offset: int) -> Optional[int]:
+        """Get the index of the first scope whose opening brace is at or after offset."""
+        index = bisect_left(self.opens, offset)
+        return index if index < len(self.opens) else None
+
+    def opened_at(self, offset: int) -> Optional[int]:
+        """Get the index of the scope whose opening brace is at offset."""
+        return self._by_open.get(offset)
+
+    def span(self, index: int) -> Tuple[int, int]:
+        """Get the (opening brace, closing brace) offsets of a scope."""
+        return self.opens[index], self.closes[index]
+
+    def is_code(self, offset: int) -> bool:
+        """Check that offset is not inside a string, template literal or comment."""
+        index = bisect_right(self._literal_starts, offset) - 1
+        return index < 0 or offset >= self._literal_ends[index]
+
+
+def scan_scopes(content: str, budget: Optional[ParseBudget] = None) -> ScopeTable:
+    """
+    Find every brace-delimited scope of a C-like source file in a single pass.
+
+    Braces inside string literals, template literals and comments are ignored;
+    ${ ... } expressions inside template literals are scanned as code. Scopes
+    that are never closed end at the last character of the file. Regular
+    expression literals are not recognized. The optional budget is checked
+    once per token.
+    """
+    budget = budget or ParseBudget()
+    opens = []
+    closes = []
+    parents = []
+    literal_starts = []
+    literal_ends = []
+    stack = []
+    length = len(content)
+    pos = 0
+
+    def scan_template(start: int) -> int:
+        """Scan a template literal from start; returns where code scanning resumes."""
+        position = start
+        while True:
+            match = _TEMPLATE_TOKEN.search(content, position)
+            if not match:
+                return length
+            token = match.group()
+            if token == '\\':
+                position = match.end() + 1
+            elif token == '`':
+                return match.end()
+            else:
+                stack.append(_TEMPLATE_EXPRESSION)
+                return match.end()
+
+    while pos < length:
+        budget.check()
+        match = _CODE_TOKEN.search(content, pos)
+        if not match:
+            break
+        token = match.group()
+        start = match.start()
+
+        if token == '{':
+            parent = -1
+            for entry in reversed(stack):
+                if entry != _TEMPLATE_EXPRESSION:
+                    parent = entry
+                    break
+            stack.append(len(opens))
+            opens.append(start)
+            closes.append(length - 1)
+            parents.append(parent)
+            pos = start + 1
+        elif token == '}':
+            pos = start + 1
+            if stack:
+                entry = stack.pop()
+                if entry == _TEMPLATE_EXPRESSION:
+                    # Back inside the template literal the expression belongs to
+                    literal_starts.append(start)
+                    pos = scan_template(start + 1)
+                    literal_ends.append(pos)
+                else:
+                    closes[entry] = start
+        elif token == '//':
+            end = content.find('\n', start)
+            pos = length if end == -1 else end
+            literal_starts.append(start)
+            literal_ends.append(pos)
+        elif token == '/*':
+            end = content.find('*/', start + 2)
+            pos = length if end == -1 else end + 2
+            literal_starts.append(start)
+            literal_ends.append(pos)
+        elif token == '`':
+            literal_starts.append(start)
+            pos = scan_template(start + 1)
+            literal_ends.append(pos)
+        else:
+            # Quoted string; an unescaped newline also ends it so a stray quote
+            # cannot swallow the rest of the file
+            string_end = _STRING_END[token]
+            position = start + 1
+            while True:
+                end_match = string_end.search(content, position)
+                if not end_match:
+                    pos = length
+                    break
+                if end_match.group() == '\\':
+                    position = end_match.end() + 1
+                    continue
+                pos = end_match.end()
+                break
+            literal_starts.append(start)
+            literal_ends.append(pos)
+
+    return ScopeTable(opens, closes, parents, literal_starts, literal_ends)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON serializers responses go through.
+
+Times app.utils.json_encoder's orjson and stdlib paths on an analysis tree,
+either one built for a repository checkout or a synthetic one.
+
+Usage:
+    python scripts/benchmark_json.py [repository_path] [--rounds N]
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import json_encoder
+from app.utils.json_encoder import dumps_orjson, dumps_stdlib
+
+
+def build_synthetic_tree(directories=200, files_per_directory=25):
+    """Build an analysis-shaped tree with functions, classes and imports on every file."""
+    root = {'name': 'root', 'type': 'directory', 'path': '/', 'children': []}
+    for d in range(directories):
+        directory = {'name': f'dir{d}', 'type': 'directory', 'path': f'/dir{d}', 'children': []}
+        for f in range(files_per_directory):
+            path = f'/dir{d}/file{f}.js'
+            directory['children'].append({
+                'name': f'file{f}.js',
+                'type': 'file',
+                'path': path,
+                'extension': 'js',
+                'size': 1000 + f,
+                'imports': [{'source': f'/dir{d}/file{(f + 1) % files_per_directory}.js', 'symbols': ['helper'], 'type': 'file'}],
+                'functions': [
+                    {
+                        'name': f'function{i}',
+                        'type': 'function',
+                        'start_line': i * 10,
+                        'end_line': i * 10 + 8,
+                        'dependencies': [{'type': 'call', 'target': f'{path}#function{i + 1}', 'line': i * 10 + 2}]
+                    }
+                    for i in range(5)
+                ],
+                'classes': [{'name': 'Widget', 'type': 'class', 'start_line': 60, 'end_line': 90, 'methods': []}]
+            })
+        root['children'].append(directory)
+    return root
+
+
+def build_repository_tree(repo_path):
+    """Analyze a repository checkout without touching the analysis cache."""
+    from app.services.enhanced_repository_service import EnhancedRepositoryService
+
+    file_tree, _ = EnhancedRepositoryService._build_analysis(repo_path)
+    return file_tree
+
+
+def time_serializer(serialize, data, rounds):
+    """Get the best time of serializing data, and the size of the output."""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        body = serialize(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the JSON serializers.')
+    parser.add_argument('repository_path', nargs='?', help='Repository checkout to analyze (default: a synthetic tree)')
+    parser.add_argument('--rounds', type=int, default=5, help='Serializations per serializer (best one is reported)')
+    args = parser.parse_args()
+
+    tree = build_repository_tree(args.repository_path) if args.repository_path else build_synthetic_tree()
+    # A repository document rides along to cover ObjectId and datetime handling
+    data = {'repository': {'_id': ObjectId(), 'created_at': datetime.utcnow()}, 'analysis': tree}
+
+    # jsonify sorts keys by default
+    serializers = [('stdlib', dumps_stdlib)]
+    if json_encoder.orjson is not None:
+        serializers.append(('orjson', dumps_orjson))
+    else:
+        print("orjson is not installed, only the stdlib serializer is measured")
+
+    results = {}
+    for name, serialize in serializers:
+        seconds, size = time_serializer(lambda value: serialize(value, sort_keys=True), data, args.rounds)
+        results[name] = seconds
+        print(f"{name:>8}: {seconds * 1000:8.1f} ms  {size / 1024 / 1024:6.2f} MB")
+
+    if 'orjson' in results:
+        print(f"  speedup: {results['stdlib'] / results['orjson']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,25 @@ import json
 import shutil
 from pathlib import Path
 
+def walk_files(directory, rel_dir=''):
+    """Yield (relative path, size) for every file below a directory, skipping .git."""
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != '.git':
+                        subdirs.append((entry.path, rel_path))
+                elif entry.is_file():
+                    yield rel_path, entry.stat().st_size
+    except OSError as e:
+        print(f"Error listing {directory}: {str(e)}")
+        return
+    
+    for path, rel_path in subdirs:
+        yield from walk_files(path, rel_path)
+
 def get_file_content(file_path):
     """Read and return the content of a file."""
     with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
@@ -17,35 +36,31 @@ def convert_files_to_json(repo_path):
     file_data = []
     
     # Walk through the repository
-    for root, _, files in os.walk(repo_path):
-        for file in files:
-            file_path = Path(os.path.join(root, file))
-            if file_path.suffix in target_extensions:
-                try:
-                    # Create relative path for structure preservation
-                    relative_path = os.path.relpath(file_path, repo_path)
-                    
-                    # Read original file content
-                    content = get_file_content(file_path)
-                    
-                    # Create txt file path
-                    txt_path = file_path.with_suffix('.txt')
-                    
-                    # Copy content to txt file
-                    with open(txt_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    
-                    # Store file information
-                    file_data.append({
-                        'original_path': relative_path,
-                        'original_extension': file_path.suffix,
-                        'content': content,
-                        'lines': len(content.splitlines()),
-                        'size': os.path.getsize(file_path)
-                    })
-                    
-                except Exception as e:
-                    print(f"Error processing {file_path}: {str(e)}")
+    for relative_path, size in walk_files(repo_path):
+        file_path = Path(repo_path) / relative_path
+        if file_path.suffix in target_extensions:
+            try:
+                # Read original file content
+                content = get_file_content(file_path)
+                
+                # Create txt file path
+                txt_path = file_path.with_suffix('.txt')
+                
+                # Copy content to txt file
+                with open(txt_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                
+                # Store file information
+                file_data.append({
+                    'original_path': relative_path,
+                    'original_extension': file_path.suffix,
+                    'content': content,
+                    'lines': len(content.splitlines()),
+                    'size': size
+                })
+                
+            except Exception as e:
+                print(f"Error processing {file_path}: {str(e)}")
     
     # Create JSON output
     output = {
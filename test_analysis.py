@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for analysis job endpoints.
+Run this script with a repository ID to test the background analysis API endpoints.
+"""
+
+import requests
+import json
+import sys
+import time
+
+BASE_URL = "http://localhost:8000/api"
+
+def print_response(response):
+    """Print the response in a formatted way."""
+    print(f"Status Code: {response.status_code}")
+    try:
+        body = response.json()
+        # The analysis tree can be large, only show its top level
+        if isinstance(body, dict) and 'children' in body:
+            body = dict(body, children=f"<{len(body['children'])} children>")
+        print(json.dumps(body, indent=2))
+    except:
+        print(response.text)
+    print("-" * 50)
+
+def test_start_analysis(repo_id):
+    """Test POST /repositories/<id>/analysis endpoint."""
+    print("\n=== Testing POST /repositories/<id>/analysis ===")
+
+    response = requests.post(f"{BASE_URL}/repositories/{repo_id}/analysis")
+    print_response(response)
+
+    # Starting again while the job is in flight returns the same job
+    print("\nStarting the analysis again:")
+    second = requests.post(f"{BASE_URL}/repositories/{repo_id}/analysis")
+    print_response(second)
+
+    return response.json() if response.status_code == 202 else None
+
+def test_poll_job(repo_id, job):
+    """Test GET /repositories/<id>/analysis/<job_id> endpoint."""
+    print("\n=== Testing GET /repositories/<id>/analysis/<job_id> ===")
+
+    for _ in range(120):
+        response = requests.get(f"{BASE_URL}/repositories/{repo_id}/analysis/{job['job_id']}")
+        status = response.json().get('status')
+        print(f"Job status: {status} ({response.json().get('files_processed')} files)")
+        if status in ('completed', 'failed'):
+            break
+        time.sleep(1)
+    print_response(response)
+
+    print("\nUnknown job:")
+    response = requests.get(f"{BASE_URL}/repositories/{repo_id}/analysis/000000000000000000000000")
+    print_response(response)
+
+def test_get_analysis(repo_id):
+    """Test GET /repositories/<id>/analyze endpoint after the job completed."""
+    print("\n=== Testing GET /repositories/<id>/analyze ===")
+
+    response = requests.get(f"{BASE_URL}/repositories/{repo_id}/analyze")
+    print_response(response)
+
+def main():
+    """Run all tests."""
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} <repository_id>")
+        sys.exit(1)
+    repo_id = sys.argv[1]
+
+    try:
+        # Check if the server is running
+        response = requests.get(f"{BASE_URL}/health")
+        if response.status_code != 200:
+            print(f"Error: Server is not running or not accessible at {BASE_URL}")
+            sys.exit(1)
+
+        # Run tests
+        job = test_start_analysis(repo_id)
+        if job:
+            test_poll_job(repo_id, job)
+        test_get_analysis(repo_id)
+
+        print("\nAll tests completed successfully!")
+    except requests.exceptions.ConnectionError:
+        print(f"Error: Could not connect to the server at {BASE_URL}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
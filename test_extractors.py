@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for the language extractors.
+Run this script to check that pathological sources are extracted quickly.
+"""
+
+import sys
+import time
+
+from app.utils.language_extractors import get_extractor
+from app.utils.parse_budget import ParseBudget
+
+# CPU seconds any of the inputs below may take; healthy runs take milliseconds
+MAX_SECONDS = 1.0
+
+# Long whitespace runs and unbalanced brackets used to make patterns and scans rescan the rest of the file
+PATHOLOGICAL_SOURCES = [
+    ('.java', 'class A {' + ' ' * 20000 + '}'),
+    ('.java', ' \n' * 20000),
+    ('.java', 'class A { void f() {' + ' \n' * 20000 + '} }'),
+    ('.js', 'class A {' + ' \n' * 50000 + '}'),
+    ('.js', 'const x = ' + ' ' * 50000),
+    ('.js', 'const x = (' * 20000),
+    ('.js', 'const x = () => (' * 20000),
+]
+
+def extract_timed(extension, content):
+    """Extract a source, returning whether it finished within the time limit and the CPU seconds it took."""
+    extractor = get_extractor(extension)
+    start = time.process_time()
+    result = extractor.extract(content, f"/Test{extension}", ParseBudget(MAX_SECONDS * 2))
+    elapsed = time.process_time() - start
+    return elapsed < MAX_SECONDS and not result.get('truncated'), elapsed
+
+def test_pathological_whitespace():
+    """Extract sources with long whitespace runs and unbalanced brackets within the time limit."""
+    for extension, content in PATHOLOGICAL_SOURCES:
+        ok, elapsed = extract_timed(extension, content)
+        assert ok, f"{extension} {len(content)} chars: {elapsed:.3f}s"
+
+def main():
+    """Run all tests."""
+    print("\n=== Testing pathological whitespace ===")
+    failures = 0
+
+    for extension, content in PATHOLOGICAL_SOURCES:
+        ok, elapsed = extract_timed(extension, content)
+        failures += 0 if ok else 1
+        print(f"{'OK  ' if ok else 'FAIL'} {extension} {len(content)} chars: {elapsed:.3f}s")
+
+    print("-" * 50)
+    if failures:
+        print(f"\n{failures} test(s) failed")
+        sys.exit(1)
+
+    print("\nAll tests completed successfully!")
+
+if __name__ == "__main__":
+    main()